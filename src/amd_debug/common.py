@@ -4,9 +4,10 @@
 This module contains common utility functions and classes for various amd-debug-tools.
 """
 
-import asyncio
+import functools
 import importlib.metadata
 import logging
+import math
 import os
 import platform
 import time
@@ -216,11 +217,17 @@ def run_countdown(action, t) -> bool:
         return False
     if t == 0:
         return True
-    while t > 0:
-        msg = f"{action} in {timedelta(seconds=t)}"
+    # nobody watches the countdown unless it's on a terminal
+    if not sys.stdout.isatty():
+        time.sleep(t)
+        return True
+    deadline = time.monotonic() + t
+    remaining = t
+    while remaining > 0:
+        msg = f"{action} in {timedelta(seconds=math.ceil(remaining))}"
         print_temporary_message(msg)
-        time.sleep(1)
-        t -= 1
+        time.sleep(min(1, remaining))
+        remaining = deadline - time.monotonic()
     clear_temporary_message(len(msg))
     return True
 
@@ -303,6 +310,8 @@ def reboot():
             return False
         return True
 
+    import asyncio  # pylint: disable=import-outside-toplevel
+
     result = asyncio.run(reboot_dbus_fast())
     if not result:
         return reboot_dbus()
@@ -322,6 +331,7 @@ def get_system_mem():
     raise ValueError("Could not find MemTotal in /proc/meminfo")
 
 
+@functools.lru_cache(maxsize=1)
 def is_root() -> bool:
     """Check if the user is root"""
     return os.geteuid() == 0
@@ -442,7 +452,9 @@ def relaunch_sudo() -> None:
         os.execvp("sudo", sudo_cmd)
 
 
+@functools.lru_cache(maxsize=1)
 def running_ssh():
+    """Check if the tool is running in an SSH session"""
     return "SSH_CLIENT" in os.environ or "SSH_TTY" in os.environ
 
 
@@ -472,6 +484,7 @@ def _git_describe() -> str:
         return None
 
 
+@functools.lru_cache(maxsize=None)
 def version() -> str:
     """Get version of the tool"""
     ver = "unknown"
@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: MIT
 
+from contextlib import contextmanager
 from datetime import datetime
 import sqlite3
 import os
@@ -8,6 +9,11 @@ from amd_debug.common import read_file
 
 SCHEMA_VERSION = 2
 
+# stay well below SQLITE_MAX_VARIABLE_NUMBER on older sqlite versions
+MAX_QUERY_PARAMS = 900
+
+INSERT_DEBUG = "INSERT into debug (t0, id, message, priority) VALUES (?, ?, ?, ?)"
+
 
 def migrate(cur, user_version) -> None:
     """Migrate sqlite database schema"""
@@ -40,6 +46,9 @@ class SleepDatabase:
     def __init__(self, dbf=None) -> None:
         self.db = None
         self.last_suspend = None
+        self._key_source = None
+        self._key = None
+        self._debug_rows = None
         self.cycle_data_cnt = 0
         self.debug_cnt = 0
 
@@ -50,6 +59,9 @@ class SleepDatabase:
         new = not os.path.exists(dbf)
         self.db = sqlite3.connect(dbf)
         cur = self.db.cursor()
+        # keep the default synchronous=FULL, with NORMAL a power loss can drop
+        # the last commit, which is the cycle that hung or crashed
+        cur.execute("PRAGMA journal_mode=WAL")
         cur.execute(
             "CREATE TABLE IF NOT EXISTS prereq_data ("
             "t0 INTEGER,"
@@ -113,6 +125,13 @@ class SleepDatabase:
         if self.db:
             self.db.close()
 
+    def _cycle_key(self) -> int:
+        """Integer t0 key of the cycle being recorded"""
+        if self.last_suspend is not self._key_source:
+            self._key = int(self.last_suspend.strftime("%Y%m%d%H%M%S"))
+            self._key_source = self.last_suspend
+        return self._key
+
     def start_cycle(self, timestamp):
         """Start a new sleep cycle"""
         assert self.db
@@ -121,7 +140,7 @@ class SleepDatabase:
         cur = self.db.cursor()
         cur.execute(
             "SELECT MAX(id) FROM cycle_data WHERE t0=?",
-            (int(self.last_suspend.strftime("%Y%m%d%H%M%S")),),
+            (self._cycle_key(),),
         )
         val = cur.fetchone()[0]
         if val is not None:
@@ -130,7 +149,7 @@ class SleepDatabase:
             self.cycle_data_cnt = 0
         cur.execute(
             "SELECT MAX(id) FROM debug WHERE t0=?",
-            (int(self.last_suspend.strftime("%Y%m%d%H%M%S")),),
+            (self._cycle_key(),),
         )
         val = cur.fetchone()[0]
         if val is not None:
@@ -143,21 +162,28 @@ class SleepDatabase:
         assert self.db
         self.db.commit()
 
+    @contextmanager
+    def batch_debug(self):
+        """Buffer debug messages and insert them together on exit"""
+        assert self.db
+        self._debug_rows = []
+        try:
+            yield
+        finally:
+            rows, self._debug_rows = self._debug_rows, None
+            if rows:
+                self.db.executemany(INSERT_DEBUG, rows)
+
     def record_debug(self, message, level=6) -> None:
         """Helper function to record a message to debug database"""
         assert self.last_suspend
         assert self.db
-        cur = self.db.cursor()
-        cur.execute(
-            "INSERT into debug (t0, id, message, priority) VALUES (?, ?, ?, ?)",
-            (
-                int(self.last_suspend.strftime("%Y%m%d%H%M%S")),
-                self.debug_cnt,
-                message,
-                level,
-            ),
-        )
+        row = (self._cycle_key(), self.debug_cnt, message, level)
         self.debug_cnt += 1
+        if self._debug_rows is not None:
+            self._debug_rows.append(row)
+            return
+        self.db.execute(INSERT_DEBUG, row)
 
     def record_debug_file(self, fn):
         """Helper function to record the entire contents of a file to debug database"""
@@ -172,23 +198,19 @@ class SleepDatabase:
         assert self.db
         assert self.last_suspend
         cur = self.db.cursor()
+        # try the update first so the second reading is a single statement
         cur.execute(
-            "SELECT * FROM battery WHERE t0=?",
-            (int(self.last_suspend.strftime("%Y%m%d%H%M%S")),),
+            "UPDATE battery SET b1=? WHERE t0=?",
+            (energy, self._cycle_key()),
         )
-        if cur.fetchone():
-            cur.execute(
-                "UPDATE battery SET b1=? WHERE t0=?",
-                (energy, int(self.last_suspend.strftime("%Y%m%d%H%M%S"))),
-            )
-        else:
+        if not cur.rowcount:
             cur.execute(
                 """
                 INSERT into battery (t0, name, b0, b1, full, unit)
                 VALUES (?, ?, ?, ?, ?, ?)
                 """,
                 (
-                    int(self.last_suspend.strftime("%Y%m%d%H%M%S")),
+                    self._cycle_key(),
                     name,
                     energy,
                     None,
@@ -211,12 +233,12 @@ class SleepDatabase:
         assert self.db
         assert self.last_suspend
         cur = self.db.cursor()
+        # Second call (post): UPDATE with e1
         cur.execute(
-            "SELECT e0 FROM power_rails WHERE t0=? AND label=?",
-            (int(self.last_suspend.strftime("%Y%m%d%H%M%S")), label),
+            "UPDATE power_rails SET e1=? WHERE t0=? AND label=?",
+            (energy, self._cycle_key(), label),
         )
-        result = cur.fetchone()
-        if result is None:
+        if not cur.rowcount:
             # First call (prep): INSERT with e0
             cur.execute(
                 """
@@ -224,18 +246,12 @@ class SleepDatabase:
                 VALUES (?, ?, ?, NULL, ?)
                 """,
                 (
-                    int(self.last_suspend.strftime("%Y%m%d%H%M%S")),
+                    self._cycle_key(),
                     label,
                     energy,
                     scale,
                 ),
             )
-        else:
-            # Second call (post): UPDATE with e1
-            cur.execute(
-                "UPDATE power_rails SET e1=? WHERE t0=? AND label=?",
-                (energy, int(self.last_suspend.strftime("%Y%m%d%H%M%S")), label),
-            )
 
     def record_cycle_data(self, message, symbol) -> None:
         """Helper function to record a message to cycle_data database"""
@@ -249,7 +265,7 @@ class SleepDatabase:
             """,
             (
                 (
-                    int(self.last_suspend.strftime("%Y%m%d%H%M%S")),
+                    self._cycle_key(),
                     self.cycle_data_cnt,
                     message,
                     symbol,
@@ -276,7 +292,7 @@ class SleepDatabase:
             VALUES (?, ?, ?, ?, ?, ?, ?)
             """,
             (
-                int(self.last_suspend.strftime("%Y%m%d%H%M%S")),
+                self._cycle_key(),
                 int(datetime.now().strftime("%Y%m%d%H%M%S")),
                 requested_duration,
                 str(active_gpios) if active_gpios else "",
@@ -298,7 +314,7 @@ class SleepDatabase:
             """,
             (
                 (
-                    int(self.last_suspend.strftime("%Y%m%d%H%M%S")),
+                    self._cycle_key(),
                     self.prereq_data_cnt,
                     message,
                     symbol,
@@ -355,9 +371,42 @@ class SleepDatabase:
             "SELECT message, symbol FROM cycle_data WHERE t0=? ORDER BY symbol",
             (int(t0.strftime("%Y%m%d%H%M%S")),),
         )
-        data = ""
-        for row in cur.fetchall():
-            data += f"{row[1]} {row[0]}\n"
+        return "".join(f"{symbol} {message}\n" for message, symbol in cur)
+
+    def _report_bulk(self, query, timestamps):
+        """Run a query for many timestamps, yielding (timestamp, row) tuples"""
+        assert self.db
+        keys = {}
+        for t0 in timestamps:
+            keys.setdefault(int(t0.strftime("%Y%m%d%H%M%S")), t0)
+        ts = list(keys)
+        cur = self.db.cursor()
+        for i in range(0, len(ts), MAX_QUERY_PARAMS):
+            chunk = ts[i : i + MAX_QUERY_PARAMS]
+            cur.execute(query.format(",".join("?" * len(chunk))), chunk)
+            for row in cur:
+                yield keys[row[0]], row[1:]
+
+    def report_cycle_data_bulk(self, timestamps) -> dict:
+        """Helper function to report cycle_data for many timestamps at once"""
+        lines = {t0: [] for t0 in timestamps}
+        for t0, (message, symbol) in self._report_bulk(
+            "SELECT t0, message, symbol FROM cycle_data WHERE t0 IN ({}) "
+            "ORDER BY t0, symbol, id",
+            timestamps,
+        ):
+            lines[t0].append(f"{symbol} {message}\n")
+        return {t0: "".join(data) for t0, data in lines.items()}
+
+    def report_debug_bulk(self, timestamps) -> dict:
+        """Helper function to report debug messages for many timestamps at once"""
+        data = {t0: [] for t0 in timestamps}
+        for t0, row in self._report_bulk(
+            "SELECT t0, message, priority FROM debug WHERE t0 IN ({}) "
+            "ORDER BY t0, id",
+            timestamps,
+        ):
+            data[t0].append(row)
         return data
 
     def report_battery(self, t0=None) -> list:
@@ -390,13 +439,23 @@ class SleepDatabase:
         )
         return cur.fetchall()
 
+    def report_power_rails_bulk(self, timestamps) -> dict:
+        """Helper function to report power rails for many timestamps at once"""
+        data = {t0: [] for t0 in timestamps}
+        for t0, row in self._report_bulk(
+            "SELECT t0, * FROM power_rails WHERE t0 IN ({}) ORDER BY t0, label",
+            timestamps,
+        ):
+            data[t0].append(row)
+        return data
+
     def get_last_prereq_ts(self) -> int:
         """Helper function to report the last line from prereq database"""
         assert self.db
         cur = self.db.cursor()
-        cur.execute("SELECT * FROM prereq_data ORDER BY t0 DESC LIMIT 1")
+        cur.execute("SELECT MAX(t0) FROM prereq_data")
         result = cur.fetchone()
-        return result[0] if result else 0
+        return result[0] if result and result[0] else 0
 
     def get_last_cycle(self) -> list:
         """Helper function to report the last line from battery database"""
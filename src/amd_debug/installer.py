@@ -15,6 +15,7 @@ from amd_debug.common import (
     systemd_in_use,
     show_log_info,
     fatal_error,
+    is_root,
     relaunch_sudo,
     AmdTool,
 )
@@ -34,7 +35,7 @@ class Headers:  # pylint: disable=too-few-public-methods
     MissingPandas = "Data library `pandas` is missing"
     MissingTabulate = "Data library `tabulate` is missing"
     MissingJinja2 = "Template library `jinja2` is missing"
-    MissingSeaborn = "Data visualization library `seaborn` is missing"
+    MissingMatplotlib = "Plotting library `matplotlib` is missing"
     UnknownDistro = "No distro installation support available, install manually"
 
 
@@ -142,15 +143,15 @@ class Jinja2Package(DistroPackage):
         )
 
 
-class SeabornPackage(DistroPackage):
-    """Class for handling the seaborn package"""
+class MatplotlibPackage(DistroPackage):
+    """Class for handling the matplotlib package"""
 
     def __init__(self):
         super().__init__(
-            deb="python3-seaborn",
-            rpm="python3-seaborn",
-            arch="python-seaborn",
-            message=Headers.MissingSeaborn,
+            deb="python3-matplotlib",
+            rpm="python3-matplotlib",
+            arch="python-matplotlib",
+            message=Headers.MissingMatplotlib,
         )
 
 
@@ -214,6 +215,18 @@ class FwupdPackage(DistroPackage):
         )
 
 
+def get_dependency_cache() -> str:
+    """Get the path of the file caching satisfied tool dependencies"""
+    # as root keep the cache out of the invoking user's home directory
+    if is_root():
+        cache = os.path.join("/", "var", "cache")
+    else:
+        cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+    return os.path.join(cache, "amd-debug-tools", "deps.ok")
+
+
 def show_install_message(message):
     """Show an install message"""
     action = Headers.InstallAction
@@ -253,8 +266,55 @@ class Installer(AmdTool):
         """Set the requirements for the installer"""
         self.requirements = args
 
+    def _dependency_fingerprint(self):
+        """Fingerprint the tools satisfying the requirements, if all are present"""
+        tools = {
+            "iasl": ["iasl"],
+            "ethtool": ["ethtool"],
+            "edid-decode": ["di-edid-decode", "edid-decode"],
+        }
+        lines = []
+        for requirement in self.requirements:
+            if requirement not in tools:
+                return None
+            for tool in tools[requirement]:
+                path = shutil.which(tool)
+                if path:
+                    break
+            else:
+                return None
+            try:
+                lines.append(f"{path} {os.stat(path).st_mtime_ns}")
+            except OSError:
+                return None
+        return "\n".join(lines) if lines else None
+
+    def _dependencies_cached(self, fingerprint) -> bool:
+        """Check if the fingerprint matches the last satisfied dependencies"""
+        if not fingerprint:
+            return False
+        try:
+            return read_file(get_dependency_cache()) == fingerprint
+        except (OSError, ValueError):
+            return False
+
+    def _cache_dependencies(self, fingerprint) -> None:
+        """Record the fingerprint of satisfied dependencies"""
+        if not fingerprint:
+            return
+        cache = get_dependency_cache()
+        try:
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+            with open(cache, "w", encoding="utf-8") as w:
+                w.write(fingerprint)
+        except OSError:
+            pass
+
     def install_dependencies(self) -> bool:
         """Install the dependencies"""
+        fingerprint = self._dependency_fingerprint()
+        if self._dependencies_cached(fingerprint):
+            return True
         if "iasl" in self.requirements:
             try:
                 iasl = subprocess.call(["iasl", "-v"], stdout=subprocess.DEVNULL) == 0
@@ -345,14 +405,15 @@ class Installer(AmdTool):
                 package = Jinja2Package()
                 if not package.install():
                     return False
-        if "seaborn" in self.requirements:
+        if "matplotlib" in self.requirements:
             try:
-                import seaborn as _  # pylint: disable=import-outside-toplevel
+                import matplotlib as _  # pylint: disable=import-outside-toplevel
             except ModuleNotFoundError:
-                package = SeabornPackage()
+                package = MatplotlibPackage()
                 if not package.install():
                     return False
 
+        self._cache_dependencies(fingerprint)
         return True
 
     def _check_systemd(self) -> bool:
@@ -456,7 +517,7 @@ def install_dep_superset() -> None | int:
         "pyudev",
         "packaging",
         "pandas",
-        "seaborn",
+        "matplotlib",
         "tabulate",
         "edid-decode",
     )
@@ -10,88 +10,92 @@ from datetime import timedelta
 from amd_debug.common import systemd_in_use, read_file, fatal_error
 
 
+# borrowed from https://github.com/fwupd/fwupd/blob/1.9.5/libfwupdplugin/fu-common-linux.c#L95
+_CMDLINE_FILTER_PREFIXES = (
+    "apparmor",
+    "audit",
+    "auto",
+    "bluetooth.disable_ertm",
+    "boot",
+    "BOOT_IMAGE",
+    "console",
+    "crashkernel",
+    "cryptdevice",
+    "cryptkey",
+    "dm",
+    "earlycon",
+    "earlyprintk",
+    "ether",
+    "init",
+    "initrd",
+    "ip",
+    "LANG",
+    "loglevel",
+    "luks.key",
+    "luks.name",
+    "luks.options",
+    "luks.uuid",
+    "mitigations",
+    "mount.usr",
+    "mount.usrflags",
+    "mount.usrfstype",
+    "netdev",
+    "netroot",
+    "nfsaddrs",
+    "nfs.nfs4_unique_id",
+    "nfsroot",
+    "noplymouth",
+    "nowatchdog",
+    "ostree",
+    "preempt",
+    "quiet",
+    "rd.dm.uuid",
+    "rd.luks.allow-discards",
+    "rd.luks.key",
+    "rd.luks.name",
+    "rd.luks.options",
+    "rd.luks.uuid",
+    "rd.lvm.lv",
+    "rd.lvm.vg",
+    "rd.md.uuid",
+    "rd.systemd.mask",
+    "rd.systemd.wants",
+    "resume",
+    "resumeflags",
+    "rhgb",
+    "ro",
+    "root",
+    "rootflags",
+    "rootfstype",
+    "roothash",
+    "rw",
+    "security",
+    "selinux",
+    "showopts",
+    "splash",
+    "swap",
+    "systemd.machine_id",
+    "systemd.mask",
+    "systemd.show_status",
+    "systemd.unit",
+    "systemd.verity_root_data",
+    "systemd.verity_root_hash",
+    "systemd.wants",
+    "udev.log_priority",
+    "verbose",
+    "vt.handoff",
+    "zfs",
+    "zswap.enabled",
+)
+
+
 def get_kernel_command_line() -> str:
     """Get the kernel command line"""
     cmdline = read_file(os.path.join("/proc", "cmdline"))
-    # borrowed from https://github.com/fwupd/fwupd/blob/1.9.5/libfwupdplugin/fu-common-linux.c#L95
-    filtered = [
-        "apparmor",
-        "audit",
-        "auto",
-        "bluetooth.disable_ertm",
-        "boot",
-        "BOOT_IMAGE",
-        "console",
-        "crashkernel",
-        "cryptdevice",
-        "cryptkey",
-        "dm",
-        "earlycon",
-        "earlyprintk",
-        "ether",
-        "init",
-        "initrd",
-        "ip",
-        "LANG",
-        "loglevel",
-        "luks.key",
-        "luks.name",
-        "luks.options",
-        "luks.uuid",
-        "mitigations",
-        "mount.usr",
-        "mount.usrflags",
-        "mount.usrfstype",
-        "netdev",
-        "netroot",
-        "nfsaddrs",
-        "nfs.nfs4_unique_id",
-        "nfsroot",
-        "noplymouth",
-        "nowatchdog",
-        "ostree",
-        "preempt",
-        "quiet",
-        "rd.dm.uuid",
-        "rd.luks.allow-discards",
-        "rd.luks.key",
-        "rd.luks.name",
-        "rd.luks.options",
-        "rd.luks.uuid",
-        "rd.lvm.lv",
-        "rd.lvm.vg",
-        "rd.md.uuid",
-        "rd.systemd.mask",
-        "rd.systemd.wants",
-        "resume",
-        "resumeflags",
-        "rhgb",
-        "ro",
-        "root",
-        "rootflags",
-        "rootfstype",
-        "roothash",
-        "rw",
-        "security",
-        "selinux",
-        "showopts",
-        "splash",
-        "swap",
-        "systemd.machine_id",
-        "systemd.mask",
-        "systemd.show_status",
-        "systemd.unit",
-        "systemd.verity_root_data",
-        "systemd.verity_root_hash",
-        "systemd.wants",
-        "udev.log_priority",
-        "verbose",
-        "vt.handoff",
-        "zfs",
-        "zswap.enabled",
-    ]
-    # remove anything that starts with something in filtered from cmdline
-    return " ".join([x for x in cmdline.split() if not x.startswith(tuple(filtered))])
+    # remove anything that starts with a filtered prefix from cmdline
+    return " ".join(
+        [x for x in cmdline.split() if not x.startswith(_CMDLINE_FILTER_PREFIXES)]
+    )
 
 
 def redact_sensitive(text: str) -> str:
@@ -120,9 +124,9 @@ def redact_sensitive(text: str) -> str:
 
 def sscanf_bios_args(line):
     """Extracts the format string and arguments from a BIOS trace line"""
-    if re.search(r"ex_trace_point", line):
+    if "ex_trace_point" in line:
         return True
-    elif re.search(r"ex_trace_args", line):
+    elif "ex_trace_args" in line:
         parts = line.split(": ", 1)
         if len(parts) < 2:
             return None
@@ -167,7 +171,7 @@ def sscanf_bios_args(line):
             # If no format string is found, assume no format modifiers and return True
             return True
     # evmisc-0132 ev_queue_notify_reques: Dispatching Notify on [UBTC] (Device) Value 0x80 (Status Change) Node 00000000851b15c1
-    elif re.search(r"ev_queue_notify_reques", line):
+    elif "ev_queue_notify_reques" in line:
         parts = line.split(": ", 1)
         if len(parts) < 2:
             return None
@@ -3,6 +3,7 @@
 import argparse
 import sys
 import os
+import pwd
 import subprocess
 import sqlite3
 
@@ -20,7 +21,6 @@ from amd_debug.common import (
 from amd_debug.validator import SleepValidator
 from amd_debug.installer import Installer
 from amd_debug.prerequisites import PrerequisiteValidator
-from amd_debug.sleep_report import SleepReport, confirm_overwrite_report
 
 
 class Defaults:
@@ -31,6 +31,8 @@ class Defaults:
     count = 1
     since = date.today() - timedelta(days=60)
     until = date.today() + timedelta(days=1)
+    since_iso = since.isoformat()
+    until_iso = until.isoformat()
     format_choices = ["txt", "md", "html", "stdout"]
     boolean_choices = ["true", "false"]
 
@@ -60,21 +62,48 @@ def display_report_file(fname, fmt) -> None:
         return
     user = os.environ.get("SUDO_USER")
     if user:
-        env_vars = []
+        env_vars = {}
         for var in ["DISPLAY", "WAYLAND_DISPLAY", "XAUTHORITY", "XDG_RUNTIME_DIR",
                     "DBUS_SESSION_BUS_ADDRESS", "XDG_SESSION_TYPE", "XDG_DATA_DIRS", "KDE_SESSION_VERSION"]:
             value = os.environ.get(var)
             if value:
-                env_vars.append(f"{var}={value}")
+                env_vars[var] = value
 
-        if env_vars:
-            cmd = ["sudo", "-u", user] + [f"env"] + env_vars + ["xdg-open", fname]
-            subprocess.call(cmd)
-        else:
+        if not env_vars:
             print(
                 "Unable to detect graphical session environment. "
                 "Report saved to: " + fname
             )
+            return
+
+        # drop privileges directly rather than going through another sudo
+        try:
+            pw = pwd.getpwnam(user)
+            # xdg-open needs PATH to find the browser and the locale to match
+            env = {
+                var: value
+                for var, value in os.environ.items()
+                if var in ("PATH", "LANG", "LANGUAGE") or var.startswith("LC_")
+            }
+            env.update(env_vars)
+            env.update(HOME=pw.pw_dir, USER=pw.pw_name, LOGNAME=pw.pw_name)
+            subprocess.call(
+                ["xdg-open", fname],
+                env=env,
+                user=pw.pw_uid,
+                group=pw.pw_gid,
+                extra_groups=os.getgrouplist(pw.pw_name, pw.pw_gid),
+                start_new_session=True,
+            )
+            return
+        except (KeyError, OSError, subprocess.SubprocessError):
+            pass
+        cmd = (
+            ["sudo", "-u", user, "env"]
+            + [f"{var}={value}" for var, value in env_vars.items()]
+            + ["xdg-open", fname]
+        )
+        subprocess.call(cmd)
 
 
 def get_report_file(report_file, extension) -> str:
@@ -99,7 +128,7 @@ def prompt_report_arguments(since, until, fname, fmt, report_debug) -> list:
         default = Defaults.since
         since = input(f"{Headers.SinceDescription} (default {default})? ")
         if not since:
-            since = default.isoformat()
+            since = Defaults.since_iso
     try:
         since = datetime.fromisoformat(since)
     except ValueError as e:
@@ -108,18 +137,19 @@ def prompt_report_arguments(since, until, fname, fmt, report_debug) -> list:
         default = Defaults.until
         until = input(f"{Headers.SinceDescription} (default {default})? ")
         if not until:
-            until = default.isoformat()
+            until = Defaults.until_iso
     try:
         until = datetime.fromisoformat(until)
     except ValueError as e:
         sys.exit(f"Invalid date, use YYYY-MM-DD: {e}")
 
     if not fmt:
+        default = get_report_format()
         fmt = input(
-            f"{Headers.FormatDescription} ({colorize_choices(Defaults.format_choices, get_report_format())})? "
+            f"{Headers.FormatDescription} ({colorize_choices(Defaults.format_choices, default)})? "
         )
         if not fmt:
-            fmt = get_report_format()
+            fmt = default
         if fmt not in Defaults.format_choices:
             sys.exit(f"Invalid format: {fmt}")
     if report_debug is None:
@@ -173,6 +203,11 @@ def prompt_test_arguments(duration, wait, count, rand) -> list:
 
 def report(since, until, fname, fmt, tool_debug, report_debug) -> bool:
     """Generate a report from previous sleep cycles"""
+    from amd_debug.sleep_report import (  # pylint: disable=import-outside-toplevel
+        SleepReport,
+        confirm_overwrite_report,
+    )
+
     try:
         since, until, fname, fmt, report_debug = prompt_report_arguments(
             since, until, fname, fmt, report_debug
@@ -213,6 +248,11 @@ def run_test_cycle(
     duration, wait, count, fmt, fname, force, debug, rand, logind, bios_debug
 ) -> bool:
     """Run a test"""
+    from amd_debug.sleep_report import (  # pylint: disable=import-outside-toplevel
+        SleepReport,
+        confirm_overwrite_report,
+    )
+
     app = Installer(tool_debug=debug)
     app.set_requirements("iasl", "ethtool", "edid-decode")
     if not app.install_dependencies():
@@ -297,18 +337,8 @@ def uninstall(debug) -> None:
         sys.exit("Failed to remove")
 
 
-def parse_args():
-    """Parse command line arguments"""
-    parser = argparse.ArgumentParser(
-        description="Swiss army knife for analyzing Linux s2idle problems",
-        epilog="The tool can run an immediate test with the 'test' command "
-        "or can be used to hook into systemd for building reports later.\n"
-        "All optional arguments will be prompted if needed.\n"
-        "To use non-interactively, please populate all optional arguments.",
-    )
-    subparsers = parser.add_subparsers(help="Possible commands", dest="action")
-
-    # 'test' command
+def _add_test_parser(subparsers) -> None:
+    """Add the 'test' command to the parser"""
     test_cmd = subparsers.add_parser("test", help="Run amd-s2idle test and report")
     test_cmd.add_argument("--count", help=Headers.CountDescription)
     test_cmd.add_argument(
@@ -350,7 +380,9 @@ def parse_args():
     )
     test_cmd.add_argument("--report-file", help=Headers.ReportFileDescription)
 
-    # 'report' command
+
+def _add_report_parser(subparsers) -> None:
+    """Add the 'report' command to the parser"""
     report_cmd = subparsers.add_parser(
         "report", help="Generate amd-s2idle report from previous runs"
     )
@@ -360,7 +392,7 @@ def parse_args():
     )
     report_cmd.add_argument(
         "--until",
-        default=Defaults.until.isoformat(),
+        default=Defaults.until_iso,
         help=Headers.UntilDescription,
     )
     report_cmd.add_argument("--report-file", help=Headers.ReportFileDescription)
@@ -380,24 +412,57 @@ def parse_args():
         help="Include debug messages in report (WARNING: can significantly increase report size)",
     )
 
+
+def _add_install_parser(subparsers) -> None:
+    """Add the 'install' command to the parser"""
+    install_cmd = subparsers.add_parser("install", help="Install systemd s2idle hook")
+    install_cmd.add_argument(
+        "--tool-debug",
+        action="store_true",
+        help="Enable tool debug logging",
+    )
+
+
+def _add_uninstall_parser(subparsers) -> None:
+    """Add the 'uninstall' command to the parser"""
+    uninstall_cmd = subparsers.add_parser(
+        "uninstall", help="Uninstall systemd s2idle hook"
+    )
+    uninstall_cmd.add_argument(
+        "--tool-debug",
+        action="store_true",
+        help="Enable tool debug logging",
+    )
+
+
+def parse_args():
+    """Parse command line arguments"""
+    cmd = sys.argv[1] if len(sys.argv) > 1 else None
+    # nothing else to parse when only asking for the version
+    if cmd == "--version" and len(sys.argv) == 2:
+        return argparse.Namespace(action=None, version=True)
+
+    parser = argparse.ArgumentParser(
+        description="Swiss army knife for analyzing Linux s2idle problems",
+        epilog="The tool can run an immediate test with the 'test' command "
+        "or can be used to hook into systemd for building reports later.\n"
+        "All optional arguments will be prompted if needed.\n"
+        "To use non-interactively, please populate all optional arguments.",
+    )
+    subparsers = parser.add_subparsers(help="Possible commands", dest="action")
+
+    commands = {"test": _add_test_parser, "report": _add_report_parser}
     # if running in a venv, install/uninstall hook options
     if sys.prefix != sys.base_prefix:
-        install_cmd = subparsers.add_parser(
-            "install", help="Install systemd s2idle hook"
-        )
-        uninstall_cmd = subparsers.add_parser(
-            "uninstall", help="Uninstall systemd s2idle hook"
-        )
-        install_cmd.add_argument(
-            "--tool-debug",
-            action="store_true",
-            help="Enable tool debug logging",
-        )
-        uninstall_cmd.add_argument(
-            "--tool-debug",
-            action="store_true",
-            help="Enable tool debug logging",
-        )
+        commands["install"] = _add_install_parser
+        commands["uninstall"] = _add_uninstall_parser
+
+    # only build the subcommand that was requested, everything for help/errors
+    if cmd in commands:
+        commands[cmd](subparsers)
+    else:
+        for add_parser in commands.values():
+            add_parser(subparsers)
 
     parser.add_argument(
         "--version", action="store_true", help="Show version information"
@@ -1,5 +1,9 @@
 # SPDX-License-Identifier: MIT
 
+import csv
+import functools
+import io
+import itertools
 import os
 import re
 import math
@@ -51,61 +55,135 @@ from amd_debug.failures import (
 from amd_debug.wake import WakeIRQ, WakeGPIO
 
 
-def remove_duplicates(x):
-    """Remove duplicates from a string"""
-    temp = re.findall(r"\d+", x)
-    res = list(map(int, temp))
-    return list(set(res))
+_DIGIT_RE = re.compile(r"\d+")
+_TAB_TO_PIPE = str.maketrans("\t", "|")
+_TR_RE = re.compile("<tr>")
+# report line prefixes keyed by their first character
+_GROUP_PREFIXES = {
+    group[0]: (group, get_group_color(group))
+    for group in ["🗣️", "❌", "🚦", "🦟", "🚫", "○"]
+}
 
 
-def format_gpio_as_str(x):
-    """Format GPIO as a nicer format"""
-    ret = []
-    for y in remove_duplicates(x):
-        ret.append(str(WakeGPIO(y)))
-    return ", ".join(ret)
+def remove_duplicates(x):
+    """Remove duplicates from a string"""
+    return list(dict.fromkeys(int(m.group()) for m in _DIGIT_RE.finditer(x)))
+
+
+def format_wake_column(column, wake):
+    """Format a column of wake sources, constructing each source only once"""
+    column = column.fillna("")
+    # most cycles share the same wake sources, so parse each distinct value once
+    rows = {value: remove_duplicates(str(value)) for value in column.unique()}
+    names = {num: str(wake(num)) for num in set().union(*rows.values())}
+    formatted = {
+        value: ", ".join(names[num] for num in row) for value, row in rows.items()
+    }
+    return list(column.map(formatted))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_ts(ts):
+    """Parse a database timestamp, remembering repeated values"""
+    # split the digits arithmetically, strptime is much slower
+    if len(ts) == 14 and ts.isascii() and ts.isdigit():
+        val = int(ts)
+        return datetime(
+            val // 10**10,
+            val // 10**8 % 100,
+            val // 10**6 % 100,
+            val // 10**4 % 100,
+            val // 100 % 100,
+            val % 100,
+        )
+    return datetime.strptime(ts, "%Y%m%d%H%M%S")
+
+
+def _to_datetime_column(column):
+    """Convert a column of YYYYMMDDHHMMSS timestamps to datetimes"""
+    ts = column.to_numpy(dtype=np.int64)
+    # build the dates with numpy calendar units, pd.to_datetime() on a frame
+    # of components costs milliseconds even for a single cycle
+    months = (ts // 10**10 - 1970) * 12 + ts // 10**8 % 100 - 1
+    days = months.astype("datetime64[M]").astype("datetime64[D]") + (
+        ts // 10**6 % 100 - 1
+    ).astype("timedelta64[D]")
+    seconds = ts // 10**4 % 100 * 3600 + ts // 100 % 100 * 60 + ts % 100
+    return pd.Series(
+        days.astype("datetime64[ns]") + seconds.astype("timedelta64[s]"),
+        index=column.index,
+    )
 
 
-def format_irq_as_str(x):
-    """Format IRQ as a nicer format"""
-    ret = []
-    for y in remove_duplicates(x):
-        ret.append(str(WakeIRQ(y)))
-    return ", ".join(ret)
+def format_html_paragraphs(text):
+    """Format each line of text as an escaped HTML paragraph"""
+    return Markup("".join(f"<p>{html.escape(line)}</p>" for line in text.split("\n")))
 
 
 def format_as_human(x):
     """Format as a human readable date"""
-    return datetime.strptime(str(x), "%Y%m%d%H%M%S")
+    return _parse_ts(str(x))
 
 
-def format_as_seconds(x):
-    """Format as seconds"""
-    return format_as_human(x).timestamp()
+def format_timedelta(val):
+    """Format seconds as a nicer format"""
+    if math.isnan(val):
+        val = 0
+    return str(timedelta(seconds=val))
 
 
-def format_watts(val):
-    """Format watts as a nicer format"""
-    return f"{val:.02f}W"
+def format_timedelta_column(column):
+    """Format a column of seconds the same way as format_timedelta()"""
+    seconds = column.fillna(0).to_numpy(dtype=float)
+    whole = seconds.astype(np.int64)
+    # only whole, positive durations are formatted in bulk
+    if not np.array_equal(whole, seconds) or (whole < 0).any():
+        return [format_timedelta(val) for val in seconds]
+    days, rem = np.divmod(whole, 86400)
+    hours, rem = np.divmod(rem, 3600)
+    minutes, secs = np.divmod(rem, 60)
+    text = np.char.add(np.char.mod("%d", hours), np.char.mod(":%02d", minutes))
+    text = np.char.add(text, np.char.mod(":%02d", secs))
+    prefix = np.char.add(
+        np.char.mod("%d", days), np.where(days == 1, " day, ", " days, ")
+    )
+    return np.where(days == 0, text, np.char.add(prefix, text))
 
 
-def format_percent(val):
-    """Format percent as a nicer format"""
-    return f"{val:.02f}%"
+@functools.lru_cache(maxsize=1)
+def _get_pyplot():
+    """Import and configure matplotlib only when a chart is built"""
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
 
+    plt.set_loglevel("warning")
+    return plt
+
+
+def _render_svg(plt, fig):
+    """Render a figure to an SVG string and release it"""
+    buf = io.StringIO()
+    try:
+        plt.savefig(buf, format="svg")
+    finally:
+        plt.close(fig)
+    return buf.getvalue()
 
-def format_timedelta(val):
-    """Format seconds as a nicer format"""
-    if math.isnan(val):
-        val = 0
-    return str(timedelta(seconds=val))
 
+@functools.lru_cache(maxsize=None)
+def _get_environment():
+    """Get the jinja2 environment for the report templates"""
+    import amd_debug  # pylint: disable=import-outside-toplevel
+
+    p = os.path.dirname(amd_debug.__file__)
+    return Environment(
+        loader=FileSystemLoader(os.path.join(p, "templates")), autoescape=True
+    )
 
-def parse_hw_sleep(hw):
-    """Parse the hardware sleep value, throwing out garbage values"""
-    if hw > 1:
-        return 0
-    return hw * 100
+
+@functools.lru_cache(maxsize=None)
+def _get_template(fmt):
+    """Get the compiled template for a report format"""
+    return _get_environment().get_template(fmt)
 
 
 class SleepReport(AmdTool):
@@ -117,13 +195,20 @@ class SleepReport(AmdTool):
 
         self.db = SleepDatabase()
         self.fname = fname
-        self.since = since
-        self.until = until
         self.debug = report_debug
         self.format = fmt
+        self.load(since, until)
+
+    def load(self, since, until):
+        """Load the cycles in a time range, reusing the open database"""
+        self.since = since
+        self.until = until
         self.failures = []
         if since and until:
             self.df = self.db.report_summary_dataframe(self.since, self.until)
+            # stdout only shows the last cycle unless debug data is requested
+            if self.format == "stdout" and not self.debug:
+                self.df = self.df.tail(1)
             self.pre_process_dataframe()
         else:
             self.df = pd.DataFrame(
@@ -171,17 +256,19 @@ class SleepReport(AmdTool):
                 else:
                     self.failures.append([index, problem, data])
 
-    def calculate_power_rail_totals(self, t0, duration):
+    def calculate_power_rail_totals(self, t0, duration, power_rails=None):
         """Calculate total power from all power rails for a given cycle
 
         Args:
             t0: Timestamp of cycle start
             duration: Duration of cycle in seconds
+            power_rails: Power rail rows for the cycle if already fetched
 
         Returns:
             Total power in watts, or None if no valid data
         """
-        power_rails = self.db.report_power_rails(t0)
+        if power_rails is None:
+            power_rails = self.db.report_power_rails(t0)
         if not power_rails or duration == 0:
             return None
 
@@ -202,89 +289,111 @@ class SleepReport(AmdTool):
 
     def pre_process_dataframe(self):
         """Pre-process the pandas dataframe"""
-        self.df["Duration"] = self.df["t1"].apply(format_as_seconds) - self.df[
-            "t0"
-        ].apply(format_as_seconds)
-        self.df["Duration"] = self.df["Duration"].replace(0, np.nan)
-        self.df["Hardware Sleep"] = (self.df["hw"] / self.df["Duration"]).apply(
-            parse_hw_sleep
+        # split the integer timestamps arithmetically rather than via strings
+        t0 = _to_datetime_column(self.df["t0"])
+        t1 = _to_datetime_column(self.df["t1"])
+        seconds = (t1 - t0).dt.total_seconds()
+        duration = seconds.replace(0, np.nan)
+        # work on the raw arrays so the arithmetic skips index alignment
+        secs = duration.to_numpy()
+        # throw out garbage values, anything over 100% is not real
+        ratio = self.df["hw"].to_numpy(dtype=float) / secs
+        hw_sleep = pd.Series(
+            np.where(ratio > 1, 0.0, ratio * 100.0), index=self.df.index
         )
+        columns = {
+            "Start Time": t0,
+            "Duration": duration,
+            "Hardware Sleep": hw_sleep,
+        }
 
         # Calculate power rail totals for each cycle
+        power_rails = self.db.report_power_rails_bulk(list(t0))
         power_rail_totals = []
-        for t0, duration in zip(self.df["t0"], self.df["Duration"]):
-            cycle_t0 = format_as_human(t0)
-            total_power = self.calculate_power_rail_totals(cycle_t0, duration)
+        for cycle_t0, cycle_duration in zip(t0, duration):
+            total_power = self.calculate_power_rail_totals(
+                cycle_t0, cycle_duration, power_rails[cycle_t0]
+            )
             power_rail_totals.append(total_power)
 
         # Use power rail data if available, otherwise fall back to battery
         has_power_rails = any(p is not None for p in power_rail_totals)
         if has_power_rails:
-            self.df["Average Power"] = power_rail_totals
-        elif not self.df["b0"].isnull().all():
-            self.df["Battery Start"] = self.df["b0"] / self.df["full"] * 100
-            self.df["Battery Delta"] = (
-                (self.df["b1"] - self.df["b0"]) / self.df["full"] * 100
-            )
-            self.df["Average Power"] = (
-                (self.df["b1"] - self.df["b0"]) / 1000000 / (self.df["Duration"] / 3600)
-            )
+            columns["Average Power"] = power_rail_totals
+        elif self.df["b0"].notna().any():
+            b0 = self.df["b0"].to_numpy(dtype=float)
+            full = self.df["full"].to_numpy(dtype=float)
+            delta = self.df["b1"].to_numpy(dtype=float) - b0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                columns["Battery Start"] = b0 / full * 100
+                columns["Battery Delta"] = delta / full * 100
+                columns["Average Power"] = delta / 1000000 / (secs / 3600)
 
         # Wake sources
-        self.df["Wake Pin"] = self.df["gpio"].apply(format_gpio_as_str)
-        self.df["Wake Interrupt"] = self.df["wake_irq"].apply(format_irq_as_str)
-        del self.df["gpio"]
-        del self.df["wake_irq"]
-
-        # Look for spurious wakeups and low hardware residency
-        [
-            self.analyze_duration(index, t0, t1, requested, hw)
-            for index, t0, t1, requested, hw in zip(
-                self.df.index,
-                self.df["t0"].apply(format_as_human),
-                self.df["t1"].apply(format_as_human),
-                self.df["requested"],
-                self.df["Hardware Sleep"],
+        columns["Wake Pin"] = format_wake_column(self.df["gpio"], WakeGPIO)
+        columns["Wake Interrupt"] = format_wake_column(self.df["wake_irq"], WakeIRQ)
+
+        # Look for spurious wakeups and low hardware residency, only
+        # analyzing the cycles that can actually have a failure
+        elapsed = seconds.to_numpy()
+        requested = self.df["requested"].to_numpy(dtype=float)
+        hw_pct = hw_sleep.to_numpy()
+        failing = ((elapsed >= 60) & (hw_pct < 90)) | (elapsed < requested * 0.9)
+        if failing.any():
+            candidates = pd.DataFrame(
+                {
+                    "t0": t0.to_numpy()[failing],
+                    "t1": t1.to_numpy()[failing],
+                    "requested": requested[failing],
+                    "hw": hw_pct[failing],
+                },
+                index=self.df.index[failing],
             )
-        ]
-        del self.df["requested"]
+            for row in candidates.itertuples(name=None):
+                self.analyze_duration(*row)
 
         # Only keep data needed
-        self.df.rename(columns={"t0": "Start Time"}, inplace=True)
-        self.df["Start Time"] = self.df["Start Time"].apply(format_as_human)
-        del self.df["b1"]
-        del self.df["b0"]
-        del self.df["full"]
-        del self.df["t1"]
-        del self.df["hw"]
+        self.df = pd.DataFrame(columns, index=self.df.index)
 
     def post_process_dataframe(self):
         """Display pandas dataframe in a more user friendly format"""
-        self.df["Duration"] = self.df["Duration"].apply(format_timedelta)
-        self.df["Hardware Sleep"] = self.df["Hardware Sleep"].apply(format_percent)
+        self.df["Duration"] = format_timedelta_column(self.df["Duration"])
+        percent = ["Hardware Sleep"]
         if "Battery Start" in self.df.columns:
-            self.df["Battery Start"] = self.df["Battery Start"].apply(format_percent)
-            self.df["Battery Delta"] = self.df["Battery Delta"].apply(format_percent)
+            percent += ["Battery Start", "Battery Delta"]
+        for col in percent:
+            self.df[col] = np.char.mod("%.2f%%", self.df[col].to_numpy(dtype=float))
         if "Average Power" in self.df.columns:
-            self.df["Average Power"] = self.df["Average Power"].apply(format_watts)
+            self.df["Average Power"] = np.char.mod(
+                "%.2fW", self.df["Average Power"].to_numpy(dtype=float)
+            )
 
     def convert_table_dataframe(self, content):
         """Convert a table like dataframe to an HTML table"""
         header = False
         rows = []
         for line in content.split("\n"):
+            if "|" not in line:
+                continue
             # only include header once
             if "int|active" in line:
                 if header:
                     continue
                 header = True
-            line = line.strip("│")
-            line = line.replace("├─", "└─")
-            if "|" in line:
-                # first column missing '|'
-                rows.append(line.replace("\t", "|"))
-        columns = [row.split("|") for row in rows]
-        df = pd.DataFrame(columns[1:], columns=columns[0])
+            # first column missing '|'
+            rows.append(line.strip("│").replace("├─", "└─").translate(_TAB_TO_PIPE))
+        # let the C parser split the rows, keeping every cell as text
+        df = pd.read_csv(
+            io.StringIO("\n".join(rows)),
+            sep="|",
+            header=None,
+            dtype=str,
+            keep_default_na=False,
+            quoting=csv.QUOTE_NONE,
+            engine="c",
+        )
+        df.columns = list(df.iloc[0])
+        df = df.iloc[1:]
         return df.to_html(index=False, justify="center", col_space=30)
 
     def get_prereq_data(self):
@@ -300,7 +409,7 @@ class SleepReport(AmdTool):
         ts = self.db.get_last_prereq_ts()
         if not ts:
             return [], "", []
-        t0 = datetime.strptime(str(ts), "%Y%m%d%H%M%S")
+        t0 = format_as_human(ts)
         for row in self.db.report_prereq(t0):
             prereq.append({"symbol": row[3], "text": row[2]})
         if self.debug:
@@ -315,17 +424,19 @@ class SleepReport(AmdTool):
                 prereq_debug.append({"data": content.strip()})
         return prereq, t0, prereq_debug
 
-    def format_power_rail_data(self, t0, t1_seconds):
+    def format_power_rail_data(self, t0, t1_seconds, power_rails=None):
         """Format power rail data for display
 
         Args:
             t0: Timestamp of cycle start
             t1_seconds: Duration of cycle in seconds
+            power_rails: Power rail rows for the cycle if already fetched
 
         Returns:
             Formatted string with power rail consumption data
         """
-        power_rails = self.db.report_power_rails(t0)
+        if power_rails is None:
+            power_rails = self.db.report_power_rails(t0)
         if not power_rails:
             return ""
 
@@ -348,72 +459,73 @@ class SleepReport(AmdTool):
         if not rail_lines:
             return ""
 
-        output = "\n━━━ Power Rail Consumption ━━━\n"
-        output += "\n".join(rail_lines) + "\n"
-        output += f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-        output += f"Total: {total_power:.3f}W\n"
-
-        return output
+        return "\n".join(
+            [
+                "",
+                "━━━ Power Rail Consumption ━━━",
+                *rail_lines,
+                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+                f"Total: {total_power:.3f}W",
+                "",
+            ]
+        )
 
-    def get_cycle_data(self):
-        """Get the cycle data"""
-        cycles = []
+    def get_cycle_data(self, limit=None):
+        """Get the cycle data, optionally only for the cycles in the limit slice"""
         debug = []
         tables = ["Wakeup Source"]
-        num = 0
-        for cycle in self.df["Start Time"]:
-            if self.format == "html":
-                data = ""
-                for line in self.db.report_cycle_data(cycle).split("\n"):
-                    data += f"<p>{html.escape(line)}</p>"
-                cycles.append({"cycle_num": num, "data": Markup(data)})
-            else:
-                cycles.append([num, self.db.report_cycle_data(cycle)])
-            if self.debug:
-                messages = []
-                priorities = []
-                for row in self.db.report_debug(cycle):
-                    content = row[0]
-                    if self.format == "html" and [
-                        table for table in tables if table in content
-                    ]:
-                        content = Markup(self.convert_table_dataframe(content))
-                    elif self.format == "html":
-                        content = Markup(html.escape(content))
-                    messages.append(content)
-                    priorities.append(get_log_priority(row[1]))
-
-                cycle_row = self.df[self.df["Start Time"] == cycle]
-                if not cycle_row.empty:
-                    duration = cycle_row["Duration"].iloc[0]
-                    power_rail_summary = self.format_power_rail_data(cycle, duration)
-                    if power_rail_summary:
-                        if self.format == "html":
-                            power_rail_summary = Markup(
-                                "".join(
-                                    f"<p>{html.escape(line)}</p>"
-                                    for line in power_rail_summary.split("\n")
-                                )
-                            )
-                        messages.append(power_rail_summary)
-                        priorities.append(get_log_priority(6))
-
-                debug.append(
-                    {"cycle_num": num, "messages": messages, "priorities": priorities}
-                )
-            num += 1
+        index = self.df.index
+        starts = list(self.df["Start Time"])
+        wanted = set(starts if limit is None else starts[limit])
+        cycle_data = self.db.report_cycle_data_bulk(list(wanted))
+        if self.format == "html":
+            cycles = [
+                {"cycle_num": num, "data": format_html_paragraphs(cycle_data[cycle])}
+                for num, cycle in zip(index, starts)
+                if cycle in wanted
+            ]
+        else:
+            cycles = [
+                [num, cycle_data[cycle]]
+                for num, cycle in zip(index, starts)
+                if cycle in wanted
+            ]
+        if not self.debug:
+            return cycles, debug
+
+        debug_data = self.db.report_debug_bulk(starts)
+        power_rails = self.db.report_power_rails_bulk(starts)
+        for num, cycle, duration in zip(index, starts, self.df["Duration"]):
+            messages = []
+            priorities = []
+            for row in debug_data[cycle]:
+                content = row[0]
+                if self.format == "html" and [
+                    table for table in tables if table in content
+                ]:
+                    content = Markup(self.convert_table_dataframe(content))
+                elif self.format == "html":
+                    content = Markup(html.escape(content))
+                messages.append(content)
+                priorities.append(get_log_priority(row[1]))
+
+            power_rail_summary = self.format_power_rail_data(
+                cycle, duration, power_rails[cycle]
+            )
+            if power_rail_summary:
+                if self.format == "html":
+                    power_rail_summary = format_html_paragraphs(power_rail_summary)
+                messages.append(power_rail_summary)
+                priorities.append(get_log_priority(6))
+
+            debug.append(
+                {"cycle_num": num, "messages": messages, "priorities": priorities}
+            )
         return cycles, debug
 
     def build_template(self, inc_prereq) -> str:
         """Build the template for the report using jinja2"""
-        import amd_debug  # pylint: disable=import-outside-toplevel
-
-        # Load the template
-        p = os.path.dirname(amd_debug.__file__)
-        environment = Environment(
-            loader=FileSystemLoader(os.path.join(p, "templates")), autoescape=True
-        )
-        template = environment.get_template(self.format)
+        template = _get_template(self.format)
 
         # Load the prereq data
         prereq = None
@@ -424,7 +536,11 @@ class SleepReport(AmdTool):
 
         # Load the cycle and/or debug data
         if not self.df.empty:
-            cycles, debug = self.get_cycle_data()
+            # stdout only shows the data for the last cycle
+            if self.format in ["md", "txt", "html"]:
+                cycles, debug = self.get_cycle_data()
+            else:
+                cycles, debug = self.get_cycle_data(slice(-1, None))
 
             self.post_process_dataframe()
             failures = None
@@ -453,19 +569,12 @@ class SleepReport(AmdTool):
                         tablefmt="fancy_grid",
                     )
             elif self.format == "html":
-                summary = ""
-                row = 0
+                row = itertools.count()
                 # we will use javascript to highlight the high values
-                for line in self.df.to_html(
-                    table_id="summary", render_links=True
-                ).split("\n"):
-                    if "<tr>" in line:
-                        line = line.replace(
-                            "<tr>",
-                            f'<tr class="row-low" onclick="pick_summary_cycle({row})">',
-                        )
-                        row = row + 1
-                    summary += line
+                summary = _TR_RE.sub(
+                    lambda _: f'<tr class="row-low" onclick="pick_summary_cycle({next(row)})">',
+                    self.df.to_html(table_id="summary", render_links=True),
+                ).replace("\n", "")
                 cycle_data = cycles
                 failures = self.failures
             # only show one cycle in stdout output even if we found more
@@ -525,7 +634,7 @@ class SleepReport(AmdTool):
 
             try:
                 with os.fdopen(fd, "w", encoding="utf-8") as f:
-                    f.write(template.render(context))
+                    template.stream(context).dump(f)
                     if "SUDO_UID" in os.environ:
                         os.fchown(
                             fd, int(os.environ["SUDO_UID"]), int(os.environ["SUDO_GID"])
@@ -542,29 +651,31 @@ class SleepReport(AmdTool):
             return template.render(context)
 
     def build_battery_chart(self):
-        """Build a battery chart using matplotlib and seaborn"""
-        import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
-        import seaborn as sns  # pylint: disable=import-outside-toplevel
-        import io  # pylint: disable=import-outside-toplevel
-
+        """Build a battery chart using matplotlib"""
         if "Average Power" not in self.df.columns or "Battery Delta" not in self.df.columns:
             return
 
-        plt.set_loglevel("warning")
-        _fig, ax1 = plt.subplots()
-        ax1.plot(self.df["Average Power"], color="green", label="Charge/Discharge Rate")
+        plt = _get_pyplot()
+        x = np.arange(len(self.df.index))
+        fig, ax1 = plt.subplots()
+        ax1.plot(
+            x,
+            self.df["Average Power"].to_numpy(),
+            color="green",
+            label="Charge/Discharge Rate",
+        )
 
         ax2 = ax1.twinx()
-        sns.barplot(
-            x=self.df.index,
-            y=self.df["Battery Delta"],
+        ax2.bar(
+            x,
+            self.df["Battery Delta"].to_numpy(),
             color="grey",
             label="Battery Change",
             alpha=0.3,
         )
-        max_range = int(len(self.df.index) / 10)
-        if max_range:
-            ax1.set_xticks(range(0, len(self.df.index), max_range))
+        step = x.size // 10
+        if step:
+            ax1.set_xticks(x[::step])
         ax1.set_xlabel("Cycle")
         ax1.set_ylabel("Rate (Watts)")
         ax1.ticklabel_format(axis="y", style="plain", useOffset=False)
@@ -575,37 +686,32 @@ class SleepReport(AmdTool):
         ax2.legend(
             lines + lines2, labels + labels2, loc="lower left", bbox_to_anchor=(0, 1)
         )
-        battery_svg = io.BytesIO()
-        plt.savefig(battery_svg, format="svg")
-        battery_svg.seek(0)
-        self.battery_svg = battery_svg.read().decode("utf-8")
+        self.battery_svg = _render_svg(plt, fig)
 
     def build_hw_sleep_chart(self):
-        """Build the hardware sleep chart using matplotlib and seaborn"""
-        import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
-        import seaborn as sns  # pylint: disable=import-outside-toplevel
-        import io  # pylint: disable=import-outside-toplevel
-
-        plt.set_loglevel("warning")
-        _fig, ax1 = plt.subplots()
+        """Build the hardware sleep chart using matplotlib"""
+        plt = _get_pyplot()
+        x = np.arange(len(self.df.index))
+        fig, ax1 = plt.subplots()
         ax1.plot(
-            self.df["Hardware Sleep"],
+            x,
+            self.df["Hardware Sleep"].to_numpy(),
             color="red",
             label="Hardware Sleep",
         )
 
         ax2 = ax1.twinx()
-        sns.barplot(
-            x=self.df.index,
-            y=self.df["Duration"] / 60,
+        ax2.bar(
+            x,
+            self.df["Duration"].to_numpy() / 60,
             color="grey",
             label="Cycle Duration",
             alpha=0.3,
         )
 
-        max_range = int(len(self.df.index) / 10)
-        if max_range:
-            ax1.set_xticks(range(0, len(self.df.index), max_range))
+        step = x.size // 10
+        if step:
+            ax1.set_xticks(x[::step])
         ax1.set_xlabel("Cycle")
         ax1.set_ylabel("Percent")
         ax2.set_yscale("log")
@@ -616,10 +722,7 @@ class SleepReport(AmdTool):
         ax2.legend(
             lines + lines2, labels + labels2, loc="lower left", bbox_to_anchor=(0, 1)
         )
-        hwsleep_svg = io.BytesIO()
-        plt.savefig(hwsleep_svg, format="svg")
-        hwsleep_svg.seek(0)
-        self.hwsleep_svg = hwsleep_svg.read().decode("utf-8")
+        self.hwsleep_svg = _render_svg(plt, fig)
 
     def run(self, inc_prereq=True):
         """Run the report"""
@@ -640,9 +743,8 @@ class SleepReport(AmdTool):
             text = line.strip()
             if not text:
                 continue
-            for group in ["🗣️", "❌", "🚦", "🦟", "🚫", "○"]:
-                if line.startswith(group):
-                    text = line.split(group)[-1]
-                    color = get_group_color(group)
-                    break
+            entry = _GROUP_PREFIXES.get(line[:1])
+            if entry and line.startswith(entry[0]):
+                group, color = entry
+                text = line.split(group)[-1]
             print_color(text, color)
@@ -1,7 +1,6 @@
 # SPDX-License-Identifier: MIT
 """TTM configuration tool"""
 
-import asyncio
 import os
 import argparse
 import glob
@@ -230,13 +229,13 @@ def main() -> None | int:
     """Main function"""
 
     args = parse_args()
-    tool = AmdTtmTool(args.tool_debug)
-    ret = False
-
     if args.version:
         print(version())
         return
-    elif args.set is not None:
+
+    tool = AmdTtmTool(args.tool_debug)
+    ret = False
+    if args.set is not None:
         if args.set <= 0:
             print("Error: GB value must be greater than 0")
             return 1
@@ -1,17 +1,22 @@
 # SPDX-License-Identifier: MIT
 
-import glob
+import functools
 import math
 import os
 import re
 import random
 import subprocess
 import time
+from contextlib import contextmanager, suppress
 from datetime import timedelta, datetime
-from packaging import version
 from pyudev import Context
 
-from amd_debug.sleep_report import SleepReport
+# logind is only used when python-dbus is installed
+try:
+    import dbus
+except ImportError:
+    dbus = None
+
 from amd_debug.database import SleepDatabase
 from amd_debug.battery import Batteries
 from amd_debug.power_rails import PowerRails
@@ -34,6 +39,23 @@ from amd_debug.failures import (
     IommuPageFault,
 )
 
+_GPIO_ACTIVE_RE = re.compile(r"GPIO.*is active")
+_DIGITS_RE = re.compile(r"\d+")
+_TRIP_POINT_TEMP_RE = re.compile(r"trip_point_(\d+)_temp$")
+
+# seconds to wait for power-profiles-daemon to answer
+POWER_PROFILE_TIMEOUT = 5
+RESUME_SIGNAL_GRACE = 60
+
+_KNOWN_COMPOSITORS = frozenset(
+    [
+        "kwin_wayland",
+        "gnome-shell",
+        "cosmic-session",
+        "hyprland",
+    ]
+)
+
 
 class Headers:
     """Header strings for the debug output"""
@@ -45,13 +67,16 @@ class Headers:
     SuspendDuration = "Suspend timer programmed for"
 
 
+@functools.lru_cache(maxsize=None)
 def soc_needs_irq1_wa(family, model, smu_version):
     """Check if the SoC needs the IRQ1 workaround"""
     if family == 0x17:
-        if model in [0x68, 0x60]:
+        if model in (0x68, 0x60):
             return True
     elif family == 0x19:
         if model == 0x50:
+            from packaging import version  # pylint: disable=import-outside-toplevel
+
             return version.parse(smu_version) < version.parse("64.66.0")
     return False
 
@@ -63,6 +88,32 @@ def toggle_pm_debug(enable):
         w.write("1" if enable else "0")
 
 
+@contextmanager
+def batch_scheduling():
+    """Collect data as a batch task on one CPU so it disturbs others less"""
+    if not hasattr(os, "SCHED_BATCH"):
+        yield
+        return
+    try:
+        affinity = os.sched_getaffinity(0)
+        policy = os.sched_getscheduler(0)
+        param = os.sched_getparam(0)
+    except OSError:
+        yield
+        return
+    with suppress(OSError):
+        os.sched_setaffinity(0, {min(affinity)})
+    with suppress(OSError):
+        os.sched_setscheduler(0, os.SCHED_BATCH, os.sched_param(0))
+    try:
+        yield
+    finally:
+        with suppress(OSError):
+            os.sched_setscheduler(0, policy, param)
+        with suppress(OSError):
+            os.sched_setaffinity(0, affinity)
+
+
 def pm_debugging(func):
     """Decorator to enable pm_debug_messages"""
 
@@ -103,61 +154,117 @@ class SleepValidator(AmdTool):
         self.hw_sleep_duration = 0
         self.failures = []
         self.gpes = {}
+        self.gpe_fds = None
+        self.sysfs_fds = {}
+        self.stable_paths = {}
+        self.cmdline = None
+        self.compositors = None
+        self.trip_points = {}
+        self.wakealarm = None
+        self.ips_status_paths = None
+        self.reporter = None
+        self.input_wakeup_devices = None
+        self.thermal_zones = None
+        self.lid_paths = None
         self.display_debug = tool_debug
         self.lockdown = check_lockdown()
         self.logind = False
-        self.upep = False
+        self.logind_manager = None
+        self.logind_properties = None
+        self.logind_loop = None
+        self.logind_sleeping = False
+        self.thermal = {}
+        self.wakeup_count = {}
+        self._reset_cycle_results()
+
+    def _reset_cycle_results(self):
+        """Clear the results gathered from the kernel log of a cycle"""
         self.cycle_count = 0
         self.upep = False
         self.upep_microsoft = False
-        self.wakeup_irqs = []
+        # dicts are used as ordered sets for first-seen deduplication
+        self.wakeup_irqs = {}
         self.idle_masks = []
         self.acpi_errors = []
         self.active_gpios = []
         self.irq1_workaround = False
-        self.thermal = {}
-        self.wakeup_count = {}
-        self.page_faults = []
-        self.notify_devices = []
+        self.page_faults = {}
+        self.notify_devices = {}
 
-    def capture_running_compositors(self):
-        """Capture information about known compositor processes found"""
+    def __del__(self):
+        for fd in (getattr(self, "gpe_fds", None) or {}).values():
+            os.close(fd)
+        for fd in getattr(self, "sysfs_fds", {}).values():
+            os.close(fd)
 
-        known_compositors = [
-            "kwin_wayland",
-            "gnome-shell",
-            "cosmic-session",
-            "hyprland",
-        ]
+    def _stable_path_exists(self, path) -> bool:
+        """Check once for a path that stays present or absent for the whole boot"""
+        if path not in self.stable_paths:
+            self.stable_paths[path] = os.path.exists(path)
+        return self.stable_paths[path]
 
-        # Get a list of all process directories in /proc
-        process_dirs = glob.glob("/proc/[0-9]*")
+    def _read_sysfs(self, path) -> str:
+        """Read a sysfs attribute through a descriptor kept open across cycles"""
+        fd = self.sysfs_fds.get(path)
+        if fd is None:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                return read_file(path)
+            self.sysfs_fds[path] = fd
+        return os.pread(fd, 4096, 0).decode("utf-8").strip()
 
-        # Extract and print the process names
-        for proc_dir in process_dirs:
-            p = os.path.join(proc_dir, "exe")
-            if not os.path.exists(p):
-                continue
-            exe = os.path.basename(os.readlink(p)).split()[0]
-            if exe in known_compositors:
-                self.db.record_debug(f"{exe} compositor is running")
+    def capture_running_compositors(self):
+        """Capture information about known compositor processes found"""
+        # the session doesn't change between cycles, only walk /proc once
+        if self.compositors is None:
+            self.compositors = []
+            with os.scandir("/proc") as it:
+                for entry in it:
+                    if not entry.name.isdigit():
+                        continue
+                    try:
+                        exe = os.readlink(f"{entry.path}/exe")
+                    except OSError:
+                        continue
+                    exe = os.path.basename(exe).split()[0]
+                    if exe in _KNOWN_COMPOSITORS:
+                        self.compositors.append(exe)
+        for exe in self.compositors:
+            self.db.record_debug(f"{exe} compositor is running")
+
+    def _spawn_power_profile(self):
+        """Start powerprofilesctl so it runs while other data is captured"""
+        cmd = ["/usr/bin/powerprofilesctl"]
+        if not os.path.exists(cmd[0]):
+            return None
+        return subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+        )
 
-    def capture_power_profile(self):
+    def capture_power_profile(self, proc=None):
         """Capture power profile information"""
-        cmd = ["/usr/bin/powerprofilesctl"]
-        if os.path.exists(cmd[0]):
-            try:
-                output = subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode(
-                    "utf-8"
-                )
-                self.db.record_debug("Power Profiles:")
-                lines = output.split("\n")
-                lines = [line for line in lines if line.strip()]
-                for line in lines:
-                    prefix = "│ " if line != lines[-1] else "└─"
-                    self.db.record_debug(f"{prefix}{line.strip()}")
-            except subprocess.CalledProcessError as e:
-                self.db.record_debug("Failed to run powerprofilesctl: %s", e.output)
+        if proc is None:
+            proc = self._spawn_power_profile()
+            if proc is None:
+                return
+        try:
+            output = proc.communicate(timeout=POWER_PROFILE_TIMEOUT)[0]
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            self.db.record_debug("Timed out waiting for powerprofilesctl")
+            return
+        if proc.returncode:
+            self.db.record_debug(f"Failed to run powerprofilesctl: {output}")
+            return
+        self.db.record_debug("Power Profiles:")
+        lines = output.split("\n")
+        lines = [line for line in lines if line.strip()]
+        last = len(lines) - 1
+        for i, line in enumerate(lines):
+            prefix = "│ " if i < last else "└─"
+            self.db.record_debug(f"{prefix}{line.strip()}")
 
     def capture_battery(self):
         """Capture battery energy levels"""
@@ -195,131 +302,165 @@ class SleepValidator(AmdTool):
             )
             self.failures += [RtcAlarmWrong()]
 
+    def _open_gpes(self) -> dict:
+        """Open the GPE counters once so every check only needs a pread"""
+        base = os.path.join("/", "sys", "firmware", "acpi", "interrupts")
+        fds = {}
+        try:
+            with os.scandir(base) as it:
+                for entry in it:
+                    if not entry.name.startswith("gpe") or entry.name == "gpe_all":
+                        continue
+                    fds[entry.name] = os.open(entry.path, os.O_RDONLY)
+        except FileNotFoundError:
+            pass
+        return fds
+
     def check_gpes(self):
         """Capture general purpose event count"""
-        base = os.path.join("/", "sys", "firmware", "acpi", "interrupts")
-        for root, _dirs, files in os.walk(base, topdown=False):
-            for fname in files:
-                if not fname.startswith("gpe") or fname == "gpe_all":
-                    continue
-                target = os.path.join(root, fname)
-                val = 0
-                with open(target, "r", encoding="utf-8") as r:
-                    val = int(r.read().split()[0])
-                if fname in self.gpes and self.gpes[fname] != val:
-                    self.db.record_debug(
-                        f"{fname} increased from {self.gpes[fname]} to {val}",
-                    )
-                self.gpes[fname] = val
+        if self.gpe_fds is None:
+            self.gpe_fds = self._open_gpes()
+        for fname, fd in self.gpe_fds.items():
+            # "<count>  <EN|STS|...>  <enabled|disabled>  <masked|unmasked>"
+            val = int(os.pread(fd, 64, 0).split(None, 1)[0])
+            old = self.gpes.get(fname)
+            if old is not None and old != val:
+                self.db.record_debug(f"{fname} increased from {old} to {val}")
+            self.gpes[fname] = val
+
+    def _children(self, index, subsystem, parent) -> list:
+        """List devices of a subsystem at or below a parent device"""
+        # enumerate each subsystem once and index it by every ancestor path
+        if subsystem not in index:
+            by_path = index[subsystem] = {}
+            for dev in self.pyudev.list_devices(subsystem=subsystem):
+                path = dev.sys_path
+                while len(path) > 1:
+                    by_path.setdefault(path, []).append(dev)
+                    path = os.path.dirname(path)
+        return index[subsystem].get(parent.sys_path, [])
+
+    def _input_sibling_name(self, index, parent) -> str:
+        """Get the name of the input sibling"""
+        for inp in self._children(index, "input", parent):
+            if not "NAME" in inp.properties:
+                continue
+            return inp.properties["NAME"]
+        return ""
+
+    @staticmethod
+    def _wake_device_parents(wake_dev) -> dict:
+        """Map each subsystem to the nearest parent of a wakeup device in it"""
+        parents = {}
+        parent = wake_dev.parent
+        while parent is not None:
+            subsystem = parent.subsystem
+            # thunderbolt devices and domains are told apart by device type
+            if subsystem == "thunderbolt":
+                subsystem = parent.device_type
+            parents.setdefault(subsystem, parent)
+            parent = parent.parent
+        return parents
+
+    def _describe_wake_device(self, wake_dev, index) -> tuple:
+        """Name a wakeup source by the type of device it hangs off of"""
+        # walk the parents once, then classify by the first matching type
+        parents = self._wake_device_parents(wake_dev)
+        i2c = parents.get("i2c")
+        if i2c is not None:
+            return self._input_sibling_name(index, i2c), i2c.sys_name
+        thunderbolt_device = parents.get("thunderbolt_device")
+        if thunderbolt_device is not None:
+            name = ""
+            if "USB4_TYPE" in thunderbolt_device.properties:
+                name = f'USB4 {thunderbolt_device.properties["USB4_TYPE"]} controller'
+            return name, thunderbolt_device.sys_name
+        thunderbolt_domain = parents.get("thunderbolt_domain")
+        if thunderbolt_domain is not None:
+            return "Thunderbolt domain", thunderbolt_domain.sys_name
+        serio = parents.get("serio")
+        if serio is not None:
+            return self._input_sibling_name(index, serio), serio.sys_name
+        rtc = parents.get("rtc")
+        if rtc is not None:
+            name = ""
+            for dev in self._children(index, "platform", rtc):
+                if dev.properties.get("DRIVER") == "alarmtimer":
+                    name = "Real Time Clock alarm timer"
+                    break
+            return name, rtc.sys_name
+        mhi = parents.get("mhi")
+        if mhi is not None:
+            return "Mobile Broadband host interface", mhi.sys_name
+        hid = parents.get("hid")
+        if hid is not None:
+            return hid.properties["HID_NAME"], hid.sys_name
+        pci = parents.get("pci")
+        if pci is not None:
+            if (
+                "ID_PCI_SUBCLASS_FROM_DATABASE" in pci.properties
+                and "ID_VENDOR_FROM_DATABASE" in pci.properties
+            ):
+                name = f'{pci.properties["ID_VENDOR_FROM_DATABASE"]} {pci.properties["ID_PCI_SUBCLASS_FROM_DATABASE"]}'
+            else:
+                name = f"PCI {pci.properties['PCI_CLASS']}"
+            return name, pci.sys_name
+        acpi = parents.get("acpi")
+        if acpi is not None:
+            name = ""
+            if acpi.driver == "button":
+                for inp in self._children(index, "input", acpi):
+                    if not "NAME" in inp.properties:
+                        continue
+                    name = f"ACPI {inp.properties['NAME']}"
+                    break
+            elif acpi.driver in ["battery", "ac"]:
+                for ps in self._children(index, "power_supply", acpi):
+                    if not "POWER_SUPPLY_NAME" in ps.properties:
+                        continue
+                    name = f"ACPI {ps.properties['POWER_SUPPLY_TYPE']}"
+            return name, acpi.sys_name
+        pnp = parents.get("pnp")
+        if pnp is not None:
+            name = "Plug-n-play"
+            if pnp.driver == "rtc_cmos":
+                name = f"{name} Real Time Clock"
+            return name, pnp.sys_name
+        return "", wake_dev.sys_path
 
     def capture_wake_sources(self):
         """Capture possible wakeup sources"""
-
-        def get_input_sibling_name(pyudev, parent):
-            """Get the name of the input sibling"""
-            for inp in pyudev.list_devices(subsystem="input", parent=parent):
-                if not "NAME" in inp.properties:
-                    continue
-                return inp.properties["NAME"]
-            return ""
-
         devices = []
+        index = {}
         for wake_dev in self.pyudev.list_devices(subsystem="wakeup"):
             p = os.path.join(wake_dev.sys_path, "device", "power", "wakeup")
-            if not os.path.exists(p):
+            try:
+                wake_en = read_file(p)
+            except FileNotFoundError:
                 continue
-            wake_en = read_file(p)
-            name = ""
-            sys_name = wake_dev.sys_path
-            # determine the type of device it hangs off of
-            acpi = wake_dev.find_parent(subsystem="acpi")
-            serio = wake_dev.find_parent(subsystem="serio")
-            rtc = wake_dev.find_parent(subsystem="rtc")
-            pci = wake_dev.find_parent(subsystem="pci")
-            mhi = wake_dev.find_parent(subsystem="mhi")
-            pnp = wake_dev.find_parent(subsystem="pnp")
-            hid = wake_dev.find_parent(subsystem="hid")
-            thunderbolt_device = wake_dev.find_parent(
-                subsystem="thunderbolt", device_type="thunderbolt_device"
-            )
-            thunderbolt_domain = wake_dev.find_parent(
-                subsystem="thunderbolt", device_type="thunderbolt_domain"
-            )
-            i2c = wake_dev.find_parent(subsystem="i2c")
-            if i2c is not None:
-                sys_name = i2c.sys_name
-                name = get_input_sibling_name(self.pyudev, i2c)
-            elif thunderbolt_device is not None:
-                if "USB4_TYPE" in thunderbolt_device.properties:
-                    name = (
-                        f'USB4 {thunderbolt_device.properties["USB4_TYPE"]} controller'
-                    )
-                sys_name = thunderbolt_device.sys_name
-            elif thunderbolt_domain is not None:
-                name = "Thunderbolt domain"
-                sys_name = thunderbolt_domain.sys_name
-            elif serio is not None:
-                sys_name = serio.sys_name
-                name = get_input_sibling_name(self.pyudev, serio)
-            elif rtc is not None:
-                sys_name = rtc.sys_name
-                for _parent in self.pyudev.list_devices(
-                    subsystem="platform", parent=rtc, DRIVER="alarmtimer"
-                ):
-                    name = "Real Time Clock alarm timer"
-                    break
-            elif mhi is not None:
-                sys_name = mhi.sys_name
-                name = "Mobile Broadband host interface"
-            elif hid is not None:
-                name = hid.properties["HID_NAME"]
-                sys_name = hid.sys_name
-            elif pci is not None:
-                sys_name = pci.sys_name
-                if (
-                    "ID_PCI_SUBCLASS_FROM_DATABASE" in pci.properties
-                    and "ID_VENDOR_FROM_DATABASE" in pci.properties
-                ):
-                    name = f'{pci.properties["ID_VENDOR_FROM_DATABASE"]} {pci.properties["ID_PCI_SUBCLASS_FROM_DATABASE"]}'
-                else:
-                    name = f"PCI {pci.properties['PCI_CLASS']}"
-            elif acpi is not None:
-                sys_name = acpi.sys_name
-                if acpi.driver == "button":
-                    for inp in self.pyudev.list_devices(subsystem="input", parent=acpi):
-                        if not "NAME" in inp.properties:
-                            continue
-                        name = f"ACPI {inp.properties['NAME']}"
-                        break
-                elif acpi.driver in ["battery", "ac"]:
-                    for ps in self.pyudev.list_devices(
-                        subsystem="power_supply", parent=acpi
-                    ):
-                        if not "POWER_SUPPLY_NAME" in ps.properties:
-                            continue
-                        name = f"ACPI {ps.properties['POWER_SUPPLY_TYPE']}"
-            elif pnp is not None:
-                name = "Plug-n-play"
-                if pnp.driver == "rtc_cmos":
-                    name = f"{name} Real Time Clock"
-                sys_name = pnp.sys_name
-
+            name, sys_name = self._describe_wake_device(wake_dev, index)
             name = name.replace('"', "")
             devices.append(f"{name}|{sys_name}|{wake_en}")
         devices.sort()
         debug_str = "Wakeup Source|Linux Device|Status\n"
-        for dev in devices:
-            debug_str += f"{dev}\n"
+        debug_str += "".join(f"{dev}\n" for dev in devices)
         self.db.record_debug(debug_str)
 
     def capture_lid(self) -> None:
         """Capture lid state"""
-        p = os.path.join("/", "proc", "acpi", "button", "lid")
-        for root, _dirs, files in os.walk(p):
-            for fname in files:
-                p = os.path.join(root, fname)
-                state = read_file(p).split(":")[1].strip()
-                self.db.record_debug(f"ACPI Lid ({p}): {state}")
+        if self.lid_paths is None:
+            self.lid_paths = []
+            base = os.path.join("/", "proc", "acpi", "button", "lid")
+            # each lid is a directory holding its state file, no deeper walk
+            with suppress(FileNotFoundError), os.scandir(base) as lids:
+                for lid in lids:
+                    if not lid.is_dir():
+                        continue
+                    with os.scandir(lid.path) as entries:
+                        self.lid_paths += [e.path for e in entries if e.is_file()]
+        for p in self.lid_paths:
+            state = read_file(p).split(":")[1].strip()
+            self.db.record_debug(f"ACPI Lid ({p}): {state}")
 
     def capture_wakeup_irq_data(self) -> bool:
         """Capture the wakeup IRQ to the log"""
@@ -334,29 +475,33 @@ class SleepValidator(AmdTool):
             message = f"{Headers.WokeFromIrq} {n} ({chip_name} {hw}-{name} {actions})"
             self.db.record_debug(message)
             irq = int(n)
-            if irq and irq not in self.wakeup_irqs:
-                self.wakeup_irqs += [irq]
+            if irq:
+                self.wakeup_irqs[irq] = None
         except OSError:
             pass
         return True
 
     def capture_amdgpu_ips_status(self):
         """Capture the AMDGPU IPS status"""
-        for device in self.pyudev.list_devices(subsystem="pci", PCI_CLASS="38000"):
-            pci_id = device.properties.get("PCI_ID")
-            if not pci_id.startswith("1002"):
-                continue
-            slot = device.properties.get("PCI_SLOT_NAME")
-            p = os.path.join(
-                "/", "sys", "kernel", "debug", "dri", slot, "amdgpu_dm_ips_status"
-            )
-            if not os.path.exists(p):
+        # the set of GPUs is fixed for the run, only enumerate PCI once
+        if self.ips_status_paths is None:
+            self.ips_status_paths = []
+            for device in self.pyudev.list_devices(subsystem="pci", PCI_CLASS="38000"):
+                pci_id = device.properties.get("PCI_ID")
+                if not pci_id.startswith("1002"):
+                    continue
+                slot = device.properties.get("PCI_SLOT_NAME")
+                dri = os.path.join("/", "sys", "kernel", "debug", "dri", slot)
+                self.ips_status_paths.append(os.path.join(dri, "amdgpu_dm_ips_status"))
+        for p in self.ips_status_paths:
+            if not self._stable_path_exists(p):
                 continue
             self.db.record_debug("IPS status")
             try:
                 lines = read_file(p).split("\n")
-                for line in lines:
-                    prefix = "│ " if line != lines[-1] else "└─"
+                last = len(lines) - 1
+                for i, line in enumerate(lines):
+                    prefix = "│ " if i < last else "└─"
                     self.db.record_debug(f"{prefix}{line}")
             except PermissionError:
                 if self.lockdown:
@@ -368,19 +513,25 @@ class SleepValidator(AmdTool):
 
     def capture_thermal(self):
         """Capture thermal zone information"""
-        devs = []
-        for dev in self.pyudev.list_devices(subsystem="acpi", DRIVER="thermal"):
-            devs.append(dev)
+        # thermal zones are registered at boot, only enumerate them once
+        if self.thermal_zones is None:
+            self.thermal_zones = list(
+                self.pyudev.list_devices(subsystem="acpi", DRIVER="thermal")
+            )
+        devs = self.thermal_zones
         if not devs:
             return
 
         self.db.record_debug("Thermal zones")
-        for dev in devs:
-            prefix = "├─ " if dev != devs[-1] else "└─"
-            detail_prefix = "│ \t" if dev != devs[-1] else "  \t"
+        last = len(devs) - 1
+        for i, dev in enumerate(devs):
+            if i < last:
+                prefix, detail_prefix = "├─ ", "│ \t"
+            else:
+                prefix, detail_prefix = "└─", "  \t"
             name = os.path.basename(dev.device_path)
             p = os.path.join(dev.sys_path, "thermal_zone")
-            temp = int(read_file(os.path.join(p, "temp"))) / 1000
+            temp = int(self._read_sysfs(os.path.join(p, "temp"))) / 1000
 
             self.db.record_debug(f"{prefix}{name}")
             if name not in self.thermal:
@@ -390,20 +541,19 @@ class SleepValidator(AmdTool):
                     f"{detail_prefix} {self.thermal[name]}°C -> {temp}°C"
                 )
 
-            # handle all trip points
-            trip_count = 0
-            for f in os.listdir(p):
-                if "trip_point" not in f:
-                    continue
-                if "temp" not in f:
-                    continue
-                trip_count = trip_count + 1
-
-            for i in range(0, trip_count):
+            # handle all trip points, a zone's trip points are fixed when it
+            # is registered so only list them on the first cycle
+            if p not in self.trip_points:
+                self.trip_points[p] = sorted(
+                    int(m.group(1))
+                    for m in map(_TRIP_POINT_TEMP_RE.match, os.listdir(p))
+                    if m
+                )
+            for i in self.trip_points[p]:
                 f = os.path.join(p, f"trip_point_{i}_type")
-                trip_type = read_file(f)
+                trip_type = self._read_sysfs(f)
                 f = os.path.join(p, f"trip_point_{i}_temp")
-                trip = int(read_file(f)) / 1000
+                trip = int(self._read_sysfs(f)) / 1000
 
                 if name not in self.thermal:
                     self.db.record_debug(f"{detail_prefix} {trip_type} trip: {trip}°C")
@@ -416,34 +566,41 @@ class SleepValidator(AmdTool):
                     return False
             self.thermal[name] = temp
 
-    def capture_input_wakeup_count(self):
+    def capture_input_wakeup_count(self, rescan=False):
         """Capture wakeup count for input related devices"""
 
-        def get_wakeup_count(device):
+        def get_wakeup_count(sys_path):
             """Get the wakeup count for a device"""
-            p = os.path.join(device.sys_path, "power", "wakeup")
-            if not os.path.exists(p):
-                return None
-            p = os.path.join(device.sys_path, "power", "wakeup_count")
-            if not os.path.exists(p):
+            # wakeup_count is only present for wakeup capable devices
+            p = os.path.join(sys_path, "power", "wakeup_count")
+            try:
+                return read_file(p)
+            except FileNotFoundError:
                 return None
-            return read_file(p)
 
         wakeup_count = {}
-        for device in self.pyudev.list_devices(subsystem="input"):
-            count = get_wakeup_count(device)
-            if count is not None:
-                wakeup_count[device.sys_path] = count
-                continue
-            # iterate parents until finding one with a wakeup count
-            # or no more parents
-            parent = device.parent
-            while parent is not None:
-                count = get_wakeup_count(parent)
+        # after resume only re-read the devices found before suspend
+        if self.input_wakeup_devices is not None and not rescan:
+            for sys_path in self.input_wakeup_devices:
+                count = get_wakeup_count(sys_path)
                 if count is not None:
-                    wakeup_count[parent.sys_path] = count
-                    break
-                parent = parent.parent
+                    wakeup_count[sys_path] = count
+        else:
+            for device in self.pyudev.list_devices(subsystem="input"):
+                count = get_wakeup_count(device.sys_path)
+                if count is not None:
+                    wakeup_count[device.sys_path] = count
+                    continue
+                # iterate parents until finding one with a wakeup count
+                # or no more parents
+                parent = device.parent
+                while parent is not None:
+                    count = get_wakeup_count(parent.sys_path)
+                    if count is not None:
+                        wakeup_count[parent.sys_path] = count
+                        break
+                    parent = parent.parent
+            self.input_wakeup_devices = list(wakeup_count)
 
         # diff the count
         for device, count in wakeup_count.items():
@@ -461,9 +618,10 @@ class SleepValidator(AmdTool):
         # try from kernel 6.4's suspend stats interface first because it works
         # even with kernel lockdown
         p = os.path.join("/", "sys", "power", "suspend_stats", "last_hw_sleep")
-        if os.path.exists(p):
+        suspend_stats = self._stable_path_exists(p)
+        if suspend_stats:
             self.hw_sleep_duration = int(read_file(p)) / 10**6
-        if not os.path.exists(p) and not self.hw_sleep_duration:
+        if not suspend_stats and not self.hw_sleep_duration:
             p = os.path.join("/", "sys", "kernel", "debug", "amd_pmc", "smu_fw_info")
             try:
                 val = read_file(p)
@@ -491,10 +649,22 @@ class SleepValidator(AmdTool):
 
     def capture_command_line(self):
         """Capture the kernel command line to debug"""
-        self.db.record_debug(f"/proc/cmdline: {get_kernel_command_line()}")
+        # the command line can't change after boot
+        if self.cmdline is None:
+            self.cmdline = get_kernel_command_line()
+        self.db.record_debug(f"/proc/cmdline: {self.cmdline}")
 
     def _analyze_kernel_log_line(self, line, priority):
-        bios_args = sscanf_bios_args(line)
+        # search for active GPIOs once and reuse the match below
+        if "GPIO" in line and "is active" in line:
+            gpio = _GPIO_ACTIVE_RE.search(line)
+        else:
+            gpio = None
+        # only BIOS trace and ACPI notify lines need the full parse
+        if "ex_trace_" in line or "ev_queue_notify_reques" in line:
+            bios_args = sscanf_bios_args(line)
+        else:
+            bios_args = None
         if bios_args:
             if isinstance(bios_args, str):
                 line = bios_args
@@ -526,42 +696,40 @@ class SleepValidator(AmdTool):
                     pass
         elif "Triggering wakeup from IRQ" in line:
             irq = int(line.split()[-1])
-            if irq and irq not in self.wakeup_irqs:
-                self.wakeup_irqs += [irq]
+            if irq:
+                self.wakeup_irqs[irq] = None
         elif "SMU idlemask s0i3" in line:
-            self.idle_masks += [line.split()[-1]]
-        elif "ACPI BIOS Error" in line or "ACPI Error" in line:
-            self.acpi_errors += [line]
-        elif re.search("GPIO.*is active", line):
-            self.active_gpios += re.findall(
-                r"\d+", re.search("GPIO.*is active", line).group()
-            )
+            self.idle_masks.append(line.split()[-1])
+        elif "ACPI " in line and ("ACPI BIOS Error" in line or "ACPI Error" in line):
+            self.acpi_errors.append(line)
+        elif gpio:
+            self.active_gpios += _DIGITS_RE.findall(gpio.group())
         elif Headers.Irq1Workaround in line:
             self.irq1_workaround = True
         # AMD-Vi: Event logged [IO_PAGE_FAULT device=0000:00:0c.0 domain=0x0000 address=0x7e800000 flags=0x0050]
         elif "Event logged [IO_PAGE_FAULT" in line:
             # get the device from string
-            device = re.search(r"device=(.*?) domain", line)
-            if device:
-                device = device.group(1)
-                if device not in self.page_faults:
-                    self.page_faults += [device]
+            _, found, rest = line.partition("device=")
+            device, found, _ = rest.partition(" domain")
+            if found:
+                self.page_faults[device] = None
 
         # evmisc-0132 ev_queue_notify_reques: Dispatching Notify on [UBTC] (Device) Value 0x80 (Status Change) Node 0000000080144eee
         if "Dispatching Notify on" in line:
             # add device without the [] to notify_devices if it's not already there
-            device = re.search(r"\[(.*?)\]", line)
-            if device:
-                device = device.group(1)
-                if device not in self.notify_devices:
-                    self.notify_devices += [device]
+            start = line.find("[")
+            end = line.find("]", start + 1) if start >= 0 else -1
+            if end >= 0:
+                self.notify_devices[line[start + 1 : end]] = None
             priority = 7
 
         self.db.record_debug(line, priority)
 
     def analyze_kernel_log(self):
         """Analyze one of the lines from the kernel log"""
-        self.kernel_log.process_callback(self._analyze_kernel_log_line)
+        # every kernel log line is recorded, insert them in one go
+        with self.db.batch_debug():
+            self.kernel_log.process_callback(self._analyze_kernel_log_line)
 
         if self.cycle_count:
             self.db.record_cycle_data(
@@ -580,17 +748,22 @@ class SleepValidator(AmdTool):
                     self.db.record_cycle_data("IRQ1 found during wakeup", "🚦")
                     self.failures += [Irq1Workaround()]
         if self.idle_masks:
+            # a bit changed if it is clear in a mask but was set in any
+            # earlier one, so keep a running OR of the masks seen so far
             bit_changed = 0
-            for i, mask_i in enumerate(self.idle_masks):
-                for _j, mask_j in enumerate(self.idle_masks[i:], start=i):
-                    if mask_i != mask_j:
-                        bit_changed = bit_changed | (int(mask_i, 16) & ~int(mask_j, 16))
-            if bit_changed:
-                for bit in range(0, 31):
-                    if bit_changed & BIT(bit):
-                        self.db.record_debug(
-                            f"Idle mask bit {bit} (0x{BIT(bit):x}) changed during suspend",
-                        )
+            seen = 0
+            for mask in self.idle_masks:
+                mask = int(mask, 16)
+                bit_changed |= seen & ~mask
+                seen |= mask
+            # only bits 0-30 are reported, visit them lowest set bit first
+            bit_changed &= BIT(31) - 1
+            while bit_changed:
+                lowest = bit_changed & -bit_changed
+                self.db.record_debug(
+                    f"Idle mask bit {lowest.bit_length() - 1} (0x{lowest:x}) changed during suspend",
+                )
+                bit_changed ^= lowest
         if self.upep:
             if self.upep_microsoft:
                 self.db.record_debug("Used Microsoft uPEP GUID in LPS0 _DSM")
@@ -601,65 +774,45 @@ class SleepValidator(AmdTool):
             self.failures += [AcpiBiosError(self.acpi_errors)]
         if self.page_faults:
             self.db.record_cycle_data("Page faults found", "❌")
-            self.failures += [IommuPageFault(self.page_faults)]
+            self.failures += [IommuPageFault(list(self.page_faults))]
         if self.notify_devices:
             self.db.record_cycle_data(
-                f"Notify devices {self.notify_devices} found during suspend", "💤"
+                f"Notify devices {list(self.notify_devices)} found during suspend", "💤"
             )
 
     def analyze_duration(self, t0, t1, requested, kernel, hw):
         """Analyze the duration of the last cycle"""
         userspace_duration = t1 - t0
+        userspace_seconds = userspace_duration.total_seconds()
         min_suspend_duration = timedelta(seconds=requested * 0.9)
-        expected_wake_time = t0 + min_suspend_duration
-        if t1 > expected_wake_time:
-            print_color(
-                f"Userspace suspended for {userspace_duration}",
-                "✅",
-            )
+        if t1 > t0 + min_suspend_duration:
+            print_color(f"Userspace suspended for {userspace_duration}", "✅")
         else:
             print_color(
                 f"Userspace suspended for {userspace_duration} (< minimum expected {min_suspend_duration})",
                 "❌",
             )
             self.failures += [SpuriousWakeup(requested, userspace_duration)]
-        percent = float(kernel) / userspace_duration.total_seconds()
+        kernel_percent = float(kernel) / userspace_seconds
         print_color(
-            f"Kernel suspended for total of {timedelta(seconds=kernel)} ({percent:.2%})",
+            f"Kernel suspended for total of {timedelta(seconds=kernel)} ({kernel_percent:.2%})",
             "✅",
         )
 
-        percent = float(hw / userspace_duration.total_seconds())
-        if userspace_duration.total_seconds() >= 60:
-            if percent > 0.9:
-                symbol = "✅"
-            else:
-                symbol = "❌"
-                self.failures += [
-                    LowHardwareSleepResidency(userspace_duration, percent)
-                ]
-        else:
-            symbol = "✅"
+        hw_percent = float(hw) / userspace_seconds
+        symbol = "✅"
+        if userspace_seconds >= 60 and hw_percent <= 0.9:
+            symbol = "❌"
+            self.failures += [LowHardwareSleepResidency(userspace_duration, hw_percent)]
+        percent_msg = f"({hw_percent:.2%})" if hw_percent else ""
         print_color(
-            "In a hardware sleep state for {time} {percent_msg}".format(
-                time=timedelta(seconds=hw),
-                percent_msg="" if not percent else "({:.2%})".format(percent),
-            ),
+            f"In a hardware sleep state for {timedelta(seconds=hw)} {percent_msg}",
             symbol,
         )
 
     def post(self):
         """Post-process the suspend test results"""
-        self.cycle_count = 0
-        self.upep = False
-        self.upep_microsoft = False
-        self.wakeup_irqs = []
-        self.idle_masks = []
-        self.acpi_errors = []
-        self.active_gpios = []
-        self.notify_devices = []
-        self.page_faults = []
-        self.irq1_workaround = False
+        self._reset_cycle_results()
 
         checks = [
             self.capture_wakeup_irq_data,
@@ -675,8 +828,9 @@ class SleepValidator(AmdTool):
             self.capture_input_wakeup_count,
             self.acpica.restore,
         ]
-        for check in checks:
-            check()
+        with batch_scheduling():
+            for check in checks:
+                check()
         self.db.record_cycle(
             self.requested_duration,
             ",".join(str(gpio) for gpio in self.active_gpios),
@@ -692,17 +846,27 @@ class SleepValidator(AmdTool):
         self.db.start_cycle(self.last_suspend)
         self.kernel_duration = 0
         self.hw_sleep_duration = 0
-        self.capture_battery()
-        self.capture_power_rails()
-        self.check_gpes()
-        self.capture_lid()
-        self.capture_command_line()
-        self.capture_wake_sources()
-        self.capture_running_compositors()
-        self.capture_power_profile()
-        self.capture_amdgpu_ips_status()
-        self.capture_thermal()
-        self.capture_input_wakeup_count()
+        # powerprofilesctl is slow to start, let it run alongside the sysfs reads
+        power_profile = self._spawn_power_profile()
+        try:
+            with batch_scheduling():
+                self.capture_battery()
+                self.capture_power_rails()
+                self.check_gpes()
+                self.capture_lid()
+                self.capture_command_line()
+                self.capture_wake_sources()
+                self.capture_running_compositors()
+                self.capture_power_profile(power_profile)
+                self.capture_amdgpu_ips_status()
+                self.capture_thermal()
+                # pick up input devices plugged in since the last cycle
+                self.capture_input_wakeup_count(rescan=True)
+        finally:
+            # reap powerprofilesctl if a capture failed before it was read
+            if power_profile is not None and power_profile.returncode is None:
+                power_profile.kill()
+                power_profile.communicate()
         if self.bios_debug:
             self.acpica.trace_bios()
         else:
@@ -711,24 +875,27 @@ class SleepValidator(AmdTool):
 
     def program_wakealarm(self):
         """Program the RTC wakealarm to wake the system after the requested duration"""
-        wakealarm = None
-        for device in self.pyudev.list_devices(subsystem="rtc"):
-            target = os.path.join(device.sys_path, "wakealarm")
-            if os.path.exists(target):
-                wakealarm = target
-                break
+        if not self.wakealarm:
+            for device in self.pyudev.list_devices(subsystem="rtc"):
+                target = os.path.join(device.sys_path, "wakealarm")
+                if os.path.exists(target):
+                    self.wakealarm = target
+                    break
+        wakealarm = self.wakealarm
         if wakealarm:
-            with open(wakealarm, "w", encoding="utf-8") as w:
-                w.write("0")
-            with open(wakealarm, "w", encoding="utf-8") as w:
-                w.write("+%s\n" % self.requested_duration)
+            fd = os.open(wakealarm, os.O_WRONLY)
+            try:
+                os.pwrite(fd, b"0", 0)
+                os.pwrite(fd, f"+{self.requested_duration}\n".encode(), 0)
+            finally:
+                os.close(fd)
         else:
             print_color("No RTC device found, please manually wake system", "🚦")
 
     def toggle_nvidia(self, value):
         """Write to the NVIDIA suspend interface"""
         p = os.path.join("/", "proc", "driver", "nvidia", "suspend")
-        if not os.path.exists(p):
+        if not self._stable_path_exists(p):
             return True
         fd = os.open(p, os.O_WRONLY | os.O_SYNC)
         try:
@@ -747,30 +914,27 @@ class SleepValidator(AmdTool):
 
         def get_wakeup_count():
             """Get the wakeup count"""
-            p = os.path.join("/", "sys", "power", "wakeup_count")
-            if not os.path.exists(p):
-                return 0
+            # only ever shown in a message, so keep the raw text
             try:
-                with open(p, "r", encoding="utf-8") as r:
-                    return int(r.read())
+                return read_file(os.path.join("/", "sys", "power", "wakeup_count"))
             except OSError:
                 return 0
 
         if self.logind:
+            if dbus is None:
+                self.db.record_cycle_data("Missing dbus", "❌")
+                return False
             try:
-                import dbus
-
-                bus = dbus.SystemBus()
-                obj = bus.get_object(
-                    "org.freedesktop.login1", "/org/freedesktop/login1"
-                )
-                intf = dbus.Interface(obj, "org.freedesktop.login1.Manager")
-                propf = dbus.Interface(obj, "org.freedesktop.DBus.Properties")
+                intf = self._logind_manager()
                 if intf.CanSuspend() != "yes":
                     self.db.record_cycle_data("Unable to suspend", "❌")
                     return False
                 intf.Suspend(True)
-                while propf.Get("org.freedesktop.login1.Manager", "PreparingForSleep"):
+                if self.logind_loop:
+                    return self._wait_for_resume_signal()
+                while self.logind_properties.Get(
+                    "org.freedesktop.login1.Manager", "PreparingForSleep"
+                ):
                     time.sleep(1)
                 return True
             except dbus.exceptions.DBusException as e:
@@ -778,9 +942,6 @@ class SleepValidator(AmdTool):
                     f"Unable to communicate with logind: {e}", "❌"
                 )
                 return False
-            except ImportError:
-                self.db.record_cycle_data("Missing dbus", "❌")
-                return False
         else:
             if not self.toggle_nvidia(b"suspend"):
                 return False
@@ -801,18 +962,74 @@ class SleepValidator(AmdTool):
                 return False
             return True
 
+    def _logind_manager(self):
+        """Connect to logind on first use and reuse the interfaces afterwards"""
+        if self.logind_manager is None:
+            try:
+                from dbus.mainloop.glib import (  # pylint: disable=import-outside-toplevel
+                    DBusGMainLoop,
+                )
+                from gi.repository import (  # pylint: disable=import-outside-toplevel
+                    GLib,
+                )
+
+                bus = dbus.SystemBus(mainloop=DBusGMainLoop())
+                bus.add_signal_receiver(
+                    self._prepare_for_sleep,
+                    signal_name="PrepareForSleep",
+                    dbus_interface="org.freedesktop.login1.Manager",
+                    bus_name="org.freedesktop.login1",
+                )
+                self.logind_loop = GLib.MainLoop()
+            except ImportError:
+                bus = dbus.SystemBus()
+            obj = bus.get_object("org.freedesktop.login1", "/org/freedesktop/login1")
+            self.logind_properties = dbus.Interface(
+                obj, "org.freedesktop.DBus.Properties"
+            )
+            self.logind_manager = dbus.Interface(obj, "org.freedesktop.login1.Manager")
+        return self.logind_manager
+
+    def _prepare_for_sleep(self, start):
+        """Stop waiting once logind announces the system has resumed"""
+        # signals are queued until the loop runs, so a resume that wasn't
+        # preceded by this cycle's suspend is left over from an earlier one
+        if start:
+            self.logind_sleeping = True
+        elif self.logind_sleeping:
+            self.logind_sleeping = False
+            self.logind_loop.quit()
+
+    def _wait_for_resume_signal(self):
+        """Run the main loop until the PrepareForSleep(false) signal arrives"""
+        from gi.repository import GLib  # pylint: disable=import-outside-toplevel
+
+        expired = []
+
+        def expire():
+            expired.append(True)
+            self.logind_loop.quit()
+            return False
+
+        self.logind_sleeping = False
+        source = GLib.timeout_add_seconds(
+            self.requested_duration + RESUME_SIGNAL_GRACE, expire
+        )
+        self.logind_loop.run()
+        if expired:
+            self.db.record_cycle_data("Timed out waiting for logind to resume", "❌")
+            return False
+        GLib.source_remove(source)
+        return True
+
     def unlock_session(self):
         """Unlock the session using logind"""
         if self.logind:
+            if dbus is None:
+                self.db.record_cycle_data("Missing dbus", "❌")
+                return False
             try:
-                import dbus
-
-                bus = dbus.SystemBus()
-                obj = bus.get_object(
-                    "org.freedesktop.login1", "/org/freedesktop/login1"
-                )
-                intf = dbus.Interface(obj, "org.freedesktop.login1.Manager")
-                intf.UnlockSessions()
+                self._logind_manager().UnlockSessions()
             except dbus.exceptions.DBusException as e:
                 self.db.record_cycle_data(
                     f"Unable to communicate with logind: {e}", "❌"
@@ -842,27 +1059,32 @@ class SleepValidator(AmdTool):
         elif count > 1:
             length = timedelta(seconds=(duration + wait) * count)
             print_color(
-                f"Running {count} cycles (Test finish expected @ {datetime.now() + length})".format(),
+                f"Running {count} cycles (Test finish expected @ {datetime.now() + length})",
                 "🗣️",
             )
+        # only randomized runs change these between cycles
+        self.requested_duration = duration
+        half_wait = math.ceil(wait / 2)
+        cycle_length = timedelta(seconds=duration + wait)
+        duration_msg = f"{Headers.SuspendDuration} {timedelta(seconds=duration)}"
         for i in range(1, count + 1):
             if rand:
                 self.requested_duration = random.randint(min_duration, duration)
                 requested_wait = random.randint(1, wait)
-            else:
-                self.requested_duration = duration
-                requested_wait = wait
-            run_countdown("Suspending system", math.ceil(requested_wait / 2))
+                half_wait = math.ceil(requested_wait / 2)
+                cycle_length = timedelta(
+                    seconds=self.requested_duration + requested_wait
+                )
+                duration_msg = f"{Headers.SuspendDuration} {timedelta(seconds=self.requested_duration)}"
+            run_countdown("Suspending system", half_wait)
             self.prep()
-            self.db.record_debug(
-                f"{Headers.SuspendDuration} {timedelta(seconds=self.requested_duration)}",
-            )
+            self.db.record_debug(duration_msg)
             if count > 1:
                 header = f"{Headers.CycleCount} {i}: "
             else:
                 header = ""
             print_color(
-                f"{header}Started at {self.last_suspend} (cycle finish expected @ {datetime.now() + timedelta(seconds=self.requested_duration + requested_wait)})",
+                f"{header}Started at {self.last_suspend} (cycle finish expected @ {datetime.now() + cycle_length})",
                 "🗣️",
             )
             self.program_wakealarm()
@@ -870,7 +1092,7 @@ class SleepValidator(AmdTool):
                 self.db.sync()
                 self.report_cycle()
                 return False
-            run_countdown("Collecting data", math.ceil(requested_wait / 2))
+            run_countdown("Collecting data", half_wait)
             self.post()
             self.db.sync()
             self.report_cycle()
@@ -895,15 +1117,23 @@ class SleepValidator(AmdTool):
 
     def report_cycle(self):
         """Report the results of the last cycle"""
+        from amd_debug.sleep_report import (  # pylint: disable=import-outside-toplevel
+            SleepReport,
+        )
+
         print_color(Headers.LastCycleResults, "🗣️")
 
-        app = SleepReport(
-            since=self.last_suspend,
-            until=self.last_suspend,
-            fname=None,
-            fmt="stdout",
-            tool_debug=self.display_debug,
-            report_debug=False,
-        )
-        app.run(inc_prereq=False)
+        # keep the report's database connection open for later cycles
+        if self.reporter is None:
+            self.reporter = SleepReport(
+                since=self.last_suspend,
+                until=self.last_suspend,
+                fname=None,
+                fmt="stdout",
+                tool_debug=self.display_debug,
+                report_debug=False,
+            )
+        else:
+            self.reporter.load(self.last_suspend, self.last_suspend)
+        self.reporter.run(inc_prereq=False)
         return
@@ -39,6 +39,7 @@ from amd_debug.common import (
     run_countdown,
     systemd_in_use,
     running_ssh,
+    version,
 )
 
 color_dict = {
@@ -85,6 +86,39 @@ class TestCommon(unittest.TestCase):
         result = run_countdown("Negative foo", -1)
         self.assertFalse(result)
 
+    @patch("amd_debug.common._git_describe", return_value='commit abc ("x")')
+    def test_version_cached(self, mock_describe):
+        """The version is only looked up once per process"""
+        version.cache_clear()
+        self.addCleanup(version.cache_clear)
+        first = version()
+        self.assertTrue(first.endswith('[commit abc ("x")]'))
+        self.assertEqual(version(), first)
+        mock_describe.assert_called_once()
+
+    @patch("amd_debug.common.print_temporary_message")
+    @patch("amd_debug.common.time.sleep")
+    def test_countdown_not_a_tty(self, mock_sleep, mock_print):
+        """Without a terminal the countdown is a single sleep"""
+        with patch("sys.stdout.isatty", return_value=False):
+            self.assertTrue(run_countdown("Quiet foo", 3))
+        mock_sleep.assert_called_once_with(3)
+        mock_print.assert_not_called()
+
+    @patch("amd_debug.common.clear_temporary_message")
+    @patch("amd_debug.common.print_temporary_message")
+    @patch("amd_debug.common.time.sleep")
+    @patch("amd_debug.common.time.monotonic")
+    def test_countdown_deadline(self, mock_monotonic, mock_sleep, mock_print, _clear):
+        """The countdown sleeps against a deadline rather than whole ticks"""
+        # oversleeping a tick is made up for by shortening the last one
+        mock_monotonic.side_effect = [100, 101.25, 102.25, 102.5]
+        with patch("sys.stdout.isatty", return_value=True):
+            self.assertTrue(run_countdown("Tty foo", 2.5))
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [1, 1, 0.25])
+        mock_print.assert_any_call("Tty foo in 0:00:03")
+        mock_print.assert_any_call("Tty foo in 0:00:01")
+
     @patch("os.path.exists", return_value=True)
     @patch("builtins.open", new_callable=mock_open, read_data="ID=foo\nVERSION_ID=bar")
     def test_get_distro_known(self, mock_exists, _mock_open):
@@ -223,16 +257,29 @@ class TestCommon(unittest.TestCase):
     @patch("os.geteuid", return_value=0)
     def test_is_root_true(self, mock_geteuid):
         """Test is_root function when user is root"""
+        is_root.cache_clear()
         self.assertTrue(is_root())
         mock_geteuid.assert_called_once()
         self.assertEqual(mock_geteuid.call_count, 1)
+        is_root.cache_clear()
 
     @patch("os.geteuid", return_value=1000)
     def test_is_root_false(self, mock_geteuid):
         """Test is_root function when user is not root"""
+        is_root.cache_clear()
         self.assertFalse(is_root())
         mock_geteuid.assert_called_once()
         self.assertEqual(mock_geteuid.call_count, 1)
+        is_root.cache_clear()
+
+    @patch("os.geteuid", return_value=0)
+    def test_is_root_cached(self, mock_geteuid):
+        """Test is_root only checks the effective uid once"""
+        is_root.cache_clear()
+        self.assertTrue(is_root())
+        self.assertTrue(is_root())
+        mock_geteuid.assert_called_once()
+        is_root.cache_clear()
 
     @patch("amd_debug.common.os.open", side_effect=OSError)
     @patch("amd_debug.common.subprocess.run")
@@ -349,10 +396,13 @@ class TestCommon(unittest.TestCase):
 
     def test_running_in_ssh(self):
         """Test running_in_ssh function"""
+        running_ssh.cache_clear()
         with patch("os.environ", {"SSH_TTY": "/dev/pts/0"}):
             self.assertTrue(running_ssh())
+        running_ssh.cache_clear()
         with patch("os.environ", {}):
             self.assertFalse(running_ssh())
+        running_ssh.cache_clear()
 
     def test_apply_prefix_wrapper(self):
         """Test apply_prefix_wrapper function"""
@@ -546,14 +596,14 @@ class TestCommon(unittest.TestCase):
         self.assertAlmostEqual(get_system_mem(), expected_gb)
         mock_file.assert_called_once_with("/proc/meminfo", "r", encoding="utf-8")
 
-    @patch("amd_debug.common.asyncio.run", return_value=True)
+    @patch("asyncio.run", return_value=True)
     def test_reboot_dbus_fast_success(self, mock_asyncio_run):
         """Test reboot returns True when reboot_dbus_fast succeeds"""
         result = reboot()
         self.assertTrue(result)
         mock_asyncio_run.assert_called_once()
 
-    @patch("amd_debug.common.asyncio.run", return_value=False)
+    @patch("asyncio.run", return_value=False)
     def test_reboot_dbus_fast_failure_and_dbus_success(self, mock_asyncio_run):
         """Test reboot falls back to reboot_dbus when reboot_dbus_fast fails"""
 
@@ -572,7 +622,7 @@ class TestCommon(unittest.TestCase):
             result = reboot()
             self.assertTrue(result)
 
-    @patch("amd_debug.common.asyncio.run", return_value=False)
+    @patch("asyncio.run", return_value=False)
     def test_reboot_dbus_fast_failure_and_dbus_failure(self, mock_asyncio_run):
         """Test reboot returns False when both reboot_dbus_fast and reboot_dbus fail"""
 
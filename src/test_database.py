@@ -4,6 +4,8 @@
 """
 This module contains unit tests for the datbase functions in the amd-debug-tools package.
 """
+import os
+import tempfile
 import unittest
 
 from datetime import datetime
@@ -41,6 +43,49 @@ class TestSleepDatabase(unittest.TestCase):
         result = cur.fetchone()
         self.assertEqual(result, ("Test debug message", 5))
 
+    def test_record_debug_follows_new_cycle(self):
+        """Debug rows use the key of whichever cycle is current"""
+        first = datetime(2025, 1, 1, 10, 0, 0)
+        second = datetime(2025, 1, 1, 11, 0, 0)
+        self.db.start_cycle(first)
+        self.db.record_debug("first")
+        self.db.start_cycle(second)
+        self.db.record_debug("second")
+        cur = self.db.db.cursor()
+        cur.execute("SELECT t0, message FROM debug ORDER BY t0")
+        self.assertEqual(
+            cur.fetchall(), [(20250101100000, "first"), (20250101110000, "second")]
+        )
+
+    def test_batch_debug(self):
+        """Batched debug messages are inserted in order when the batch ends"""
+        timestamp = datetime(2025, 1, 1, 10, 0, 0)
+        self.db.start_cycle(timestamp)
+        self.db.record_debug("before")
+        cur = self.db.db.cursor()
+        with self.db.batch_debug():
+            self.db.record_debug("first", 7)
+            self.db.record_debug("second")
+            cur.execute("SELECT COUNT(*) FROM debug")
+            self.assertEqual(cur.fetchone()[0], 1)
+        self.db.record_debug("after")
+        cur.execute("SELECT id, message, priority FROM debug ORDER BY id")
+        self.assertEqual(
+            cur.fetchall(),
+            [(0, "before", 6), (1, "first", 7), (2, "second", 6), (3, "after", 6)],
+        )
+
+    def test_batch_debug_flushes_on_error(self):
+        """Messages buffered before an exception are still inserted"""
+        self.db.start_cycle(datetime(2025, 1, 1, 10, 0, 0))
+        with self.assertRaises(RuntimeError):
+            with self.db.batch_debug():
+                self.db.record_debug("kept")
+                raise RuntimeError("boom")
+        cur = self.db.db.cursor()
+        cur.execute("SELECT message FROM debug")
+        self.assertEqual(cur.fetchall(), [("kept",)])
+
     def test_record_battery_energy(self):
         """Test recording battery energy"""
         timestamp = datetime.now()
@@ -54,6 +99,19 @@ class TestSleepDatabase(unittest.TestCase):
         result = cur.fetchone()
         self.assertEqual(result, ("Battery1", 50, None, 100, "mWh"))
 
+    def test_record_battery_energy_update(self):
+        """Test the second battery reading fills in b1"""
+        timestamp = datetime.now()
+        self.db.start_cycle(timestamp)
+        self.db.record_battery_energy("Battery1", 50, 100, "mWh")
+        self.db.record_battery_energy("Battery1", 45, 100, "mWh")
+        cur = self.db.db.cursor()
+        cur.execute(
+            "SELECT name, b0, b1, full, unit FROM battery WHERE t0=?",
+            (int(timestamp.strftime("%Y%m%d%H%M%S")),),
+        )
+        self.assertEqual(cur.fetchall(), [("Battery1", 50, 45, 100, "mWh")])
+
     def test_record_cycle_data(self):
         """Test recording cycle data"""
         timestamp = datetime.now()
@@ -268,6 +326,37 @@ class TestSleepDatabase(unittest.TestCase):
         expected_result = "symbol1 Test cycle data 1\nsymbol2 Test cycle data 2\n"
         self.assertEqual(result, expected_result)
 
+    def test_report_cycle_data_bulk(self):
+        """Test reporting cycle data for several cycles at once"""
+        first = datetime(2024, 1, 1, 10, 0, 0)
+        second = datetime(2024, 1, 1, 11, 0, 0)
+        empty = datetime(2024, 1, 1, 12, 0, 0)
+        self.db.start_cycle(first)
+        self.db.record_cycle_data("Test cycle data 2", "symbol2")
+        self.db.record_cycle_data("Test cycle data 1", "symbol1")
+        self.db.start_cycle(second)
+        self.db.record_cycle_data("Test cycle data 3", "symbol3")
+        with patch("amd_debug.database.MAX_QUERY_PARAMS", 1):
+            result = self.db.report_cycle_data_bulk([first, second, empty])
+        self.assertEqual(
+            result,
+            {
+                first: self.db.report_cycle_data(first),
+                second: "symbol3 Test cycle data 3\n",
+                empty: "",
+            },
+        )
+
+    def test_report_debug_bulk(self):
+        """Test reporting debug messages for several cycles at once"""
+        first = datetime(2024, 1, 1, 10, 0, 0)
+        second = datetime(2024, 1, 1, 11, 0, 0)
+        self.db.start_cycle(first)
+        self.db.record_debug("first 1", level=5)
+        self.db.record_debug("first 2", level=7)
+        result = self.db.report_debug_bulk([first, second])
+        self.assertEqual(result, {first: self.db.report_debug(first), second: []})
+
     def test_report_cycle_data_no_data(self):
         """Test reporting cycle data when no data exists"""
         timestamp = datetime.now()
@@ -334,8 +423,12 @@ class TestSleepDatabase(unittest.TestCase):
         )
         results = cur.fetchall()
         self.assertEqual(len(results), 3)
-        self.assertEqual(results[0], ("CPU_VDDCR_PH1", 1000000.0, 1050000.0, 149011.611))
-        self.assertEqual(results[1], ("CPU_VDDCR_PH2", 2000000.0, 2100000.0, 149011.611))
+        self.assertEqual(
+            results[0], ("CPU_VDDCR_PH1", 1000000.0, 1050000.0, 149011.611)
+        )
+        self.assertEqual(
+            results[1], ("CPU_VDDCR_PH2", 2000000.0, 2100000.0, 149011.611)
+        )
         self.assertEqual(results[2], ("VDDIO", 3000000.0, 3150000.0, 23751.3))
 
     def test_report_power_rails(self):
@@ -358,6 +451,16 @@ class TestSleepDatabase(unittest.TestCase):
             ],
         )
 
+    def test_report_power_rails_bulk(self):
+        """Test reporting power rails for several cycles at once"""
+        first = datetime(2024, 1, 1, 10, 0, 0)
+        second = datetime(2024, 1, 1, 11, 0, 0)
+        self.db.start_cycle(first)
+        self.db.record_power_rail_energy("VDDIO", 3000000.0, 23751.3)
+        self.db.record_power_rail_energy("CPU_VDDCR_PH1", 1000000.0, 149011.611)
+        result = self.db.report_power_rails_bulk([first, second])
+        self.assertEqual(result, {first: self.db.report_power_rails(first), second: []})
+
     def test_report_power_rails_no_data(self):
         """Test reporting power rails when no data exists"""
         timestamp = datetime.now()
@@ -382,6 +485,18 @@ class TestSleepDatabase(unittest.TestCase):
                 for arg in call.args:
                     self.assertNotIn("/var/local", str(arg))
 
+    def test_durable_commits(self):
+        """Test commits are synced so the last cycle survives a power loss"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = SleepDatabase(dbf=os.path.join(tmpdir, "data.db"))
+            cur = db.db.cursor()
+            cur.execute("PRAGMA journal_mode")
+            self.assertEqual(cur.fetchone()[0], "wal")
+            cur.execute("PRAGMA synchronous")
+            # 2 is FULL
+            self.assertEqual(cur.fetchone()[0], 2)
+            db.db.close()
+
     def test_schema_migration_v1_to_v2(self):
         """Test database migration from schema v1 to v2"""
         # Create a new database (will be at v2)
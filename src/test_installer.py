@@ -7,13 +7,16 @@ This module contains unit tests for the installer functions in the amd-debug-too
 from unittest.mock import patch, mock_open, MagicMock
 
 import logging
+import os
 import subprocess
 import sys
+import tempfile
 import unittest
 
 from amd_debug.installer import (
     Installer,
     DistroPackage,
+    get_dependency_cache,
     FwupdPackage,
     EdidDecodePackage,
     install_dep_superset,
@@ -31,6 +34,88 @@ class TestInstaller(unittest.TestCase):
 
     def setUp(self):
         self.installer = Installer(tool_debug=False)
+        # pylint: disable-next=consider-using-with
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        env = patch.dict("os.environ", {"XDG_CACHE_HOME": self.cache_dir.name})
+        env.start()
+        self.addCleanup(env.stop)
+        root = patch("amd_debug.installer.is_root", return_value=False)
+        root.start()
+        self.addCleanup(root.stop)
+
+    @patch("shutil.which", side_effect=lambda tool: f"/usr/bin/{tool}")
+    @patch("subprocess.call", return_value=0)
+    def test_dependencies_cached(self, mock_call, _mock_which):
+        """Test satisfied tool dependencies are not probed again"""
+        real_stat = os.stat
+        mtime = MagicMock(st_mtime_ns=1)
+        stat = patch(
+            "os.stat",
+            side_effect=lambda p, *args, **kwargs: (
+                mtime if p.startswith("/usr/bin/") else real_stat(p, *args, **kwargs)
+            ),
+        )
+        stat.start()
+        self.addCleanup(stat.stop)
+        self.installer.set_requirements("iasl", "ethtool")
+        self.assertTrue(self.installer.install_dependencies())
+        self.assertEqual(mock_call.call_count, 2)
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(self.cache_dir.name, "amd-debug-tools", "deps.ok")
+            )
+        )
+        mock_call.reset_mock()
+        self.assertTrue(self.installer.install_dependencies())
+        mock_call.assert_not_called()
+
+        # a tool update invalidates the cache
+        mtime.st_mtime_ns = 2
+        self.assertTrue(self.installer.install_dependencies())
+        self.assertEqual(mock_call.call_count, 2)
+
+    @patch("shutil.which", return_value=None)
+    @patch("subprocess.call", return_value=0)
+    def test_dependencies_not_cached_when_missing(self, mock_call, _mock_which):
+        """Test the dependency cache is skipped when a tool can't be found"""
+        self.installer.set_requirements("iasl")
+        self.assertTrue(self.installer.install_dependencies())
+        self.assertTrue(self.installer.install_dependencies())
+        self.assertEqual(mock_call.call_count, 2)
+        self.assertFalse(
+            os.path.exists(
+                os.path.join(self.cache_dir.name, "amd-debug-tools", "deps.ok")
+            )
+        )
+
+    @patch("shutil.which", side_effect=lambda tool: f"/usr/bin/{tool}")
+    @patch("os.stat", side_effect=PermissionError)
+    @patch("subprocess.call", return_value=0)
+    def test_dependencies_not_cached_when_unreadable(
+        self, mock_call, _mock_stat, _mock_which
+    ):
+        """Test the dependency cache is skipped when a tool can't be inspected"""
+        self.installer.set_requirements("iasl")
+        self.assertTrue(self.installer.install_dependencies())
+        self.assertTrue(self.installer.install_dependencies())
+        self.assertEqual(mock_call.call_count, 2)
+        self.assertFalse(
+            os.path.exists(
+                os.path.join(self.cache_dir.name, "amd-debug-tools", "deps.ok")
+            )
+        )
+
+    def test_dependency_cache_as_root(self):
+        """Test root keeps the dependency cache out of the user's home"""
+        with patch("amd_debug.installer.is_root", return_value=True):
+            self.assertEqual(
+                get_dependency_cache(), "/var/cache/amd-debug-tools/deps.ok"
+            )
+        self.assertEqual(
+            get_dependency_cache(),
+            os.path.join(self.cache_dir.name, "amd-debug-tools", "deps.ok"),
+        )
 
     @patch("builtins.print")
     @patch("shutil.copy", return_value=None)
@@ -430,17 +515,24 @@ class TestInstaller(unittest.TestCase):
 
     @patch("builtins.print")
     @patch("os.execvp", return_value=None)
-    def test_install_seaborn_present(self, _execvp, _print):
-        """seaborn already importable"""
-        self.installer.set_requirements("seaborn")
+    def test_install_matplotlib_present(self, _execvp, _print):
+        """matplotlib already importable"""
+        self.installer.set_requirements("matplotlib")
+        self.assertTrue(self.installer.install_dependencies())
+
+    @patch.dict("sys.modules", {"matplotlib": None})
+    @patch("amd_debug.installer.MatplotlibPackage")
+    def test_install_matplotlib_missing(self, mock_package):
+        """matplotlib is installed from the distro when missing"""
+        mock_package.return_value.install.return_value = True
+        self.installer.set_requirements("matplotlib")
         self.assertTrue(self.installer.install_dependencies())
+        mock_package.return_value.install.assert_called_once()
 
     @patch("amd_debug.installer.print_color")
     @patch("amd_debug.installer.get_distro", return_value="ubuntu")
     @patch("amd_debug.installer.relaunch_sudo")
-    def test_distro_package_no_deb_returns_false(
-        self, _sudo, _distro, _print
-    ):
+    def test_distro_package_no_deb_returns_false(self, _sudo, _distro, _print):
         """Ubuntu install path returns False when deb name is missing"""
         pkg = DistroPackage(deb=None, rpm="x", arch="x", message="msg")
         self.assertFalse(pkg.install())
@@ -449,9 +541,7 @@ class TestInstaller(unittest.TestCase):
     @patch("amd_debug.installer.read_file", return_value="VARIANT_ID=workstation\n")
     @patch("amd_debug.installer.get_distro", return_value="fedora")
     @patch("amd_debug.installer.relaunch_sudo")
-    def test_distro_package_no_rpm_returns_false(
-        self, _sudo, _distro, _read, _print
-    ):
+    def test_distro_package_no_rpm_returns_false(self, _sudo, _distro, _read, _print):
         """Fedora install path returns False when rpm name is missing"""
         pkg = DistroPackage(deb="x", rpm=None, arch="x", message="msg")
         self.assertFalse(pkg.install())
@@ -460,9 +550,7 @@ class TestInstaller(unittest.TestCase):
     @patch("amd_debug.installer.read_file", return_value="VARIANT_ID=server\n")
     @patch("amd_debug.installer.get_distro", return_value="fedora")
     @patch("amd_debug.installer.relaunch_sudo")
-    def test_distro_package_fedora_wrong_variant(
-        self, _sudo, _distro, _read, _print
-    ):
+    def test_distro_package_fedora_wrong_variant(self, _sudo, _distro, _read, _print):
         """Fedora install path returns False when variant isn't workstation/kde"""
         pkg = DistroPackage(deb="x", rpm="x", arch="x", message="msg")
         self.assertFalse(pkg.install())
@@ -120,6 +120,14 @@ class TestParseArgs(unittest.TestCase):
         sys.argv = ["s2idle.py", "--version"]
         args = parse_args()
         self.assertTrue(args.version)
+        self.assertIsNone(args.action)
+
+    @patch("sys.stderr")
+    def test_version_with_extra_arguments(self, _mock_print):
+        """Test parse_args still validates arguments passed with --version"""
+        sys.argv = ["s2idle.py", "--version", "--foo"]
+        with self.assertRaises(SystemExit):
+            parse_args()
 
 
 class TestMainFunction(unittest.TestCase):
@@ -356,7 +364,7 @@ class TestTestFunction(unittest.TestCase):
     @patch("amd_debug.s2idle.Installer")
     @patch("amd_debug.s2idle.PrerequisiteValidator")
     @patch("amd_debug.s2idle.SleepValidator")
-    @patch("amd_debug.s2idle.SleepReport")
+    @patch("amd_debug.sleep_report.SleepReport")
     @patch("amd_debug.s2idle.prompt_test_arguments")
     @patch("amd_debug.s2idle.prompt_report_arguments")
     @patch("amd_debug.s2idle.display_report_file")
@@ -467,7 +475,7 @@ class TestTestFunction(unittest.TestCase):
     @patch("amd_debug.s2idle.Installer")
     @patch("amd_debug.s2idle.PrerequisiteValidator")
     @patch("amd_debug.s2idle.SleepValidator")
-    @patch("amd_debug.s2idle.SleepReport")
+    @patch("amd_debug.sleep_report.SleepReport")
     @patch("amd_debug.s2idle.prompt_test_arguments")
     @patch("amd_debug.s2idle.prompt_report_arguments")
     @patch("amd_debug.s2idle.display_report_file")
@@ -622,6 +630,61 @@ class TestDisplayReportFile(unittest.TestCase):
         assert "xdg-open" in call_args
         assert "report.html" in call_args
 
+    @patch("amd_debug.s2idle.is_root", return_value=True)
+    @patch("amd_debug.s2idle.os.getgrouplist", return_value=[1000, 27])
+    @patch("amd_debug.s2idle.pwd.getpwnam")
+    @patch(
+        "os.environ.get",
+        side_effect=lambda key: "testuser" if key == "SUDO_USER" else "foo",
+    )
+    @patch("subprocess.call")
+    def test_display_report_file_html_root_drop_privileges(
+        self,
+        mock_subprocess_call,
+        _mock_env_get,
+        mock_getpwnam,
+        _mock_groups,
+        _mock_is_root,
+    ):
+        """Test display_report_file launches xdg-open as SUDO_USER without sudo"""
+        mock_getpwnam.return_value.pw_uid = 1000
+        mock_getpwnam.return_value.pw_gid = 1000
+        mock_getpwnam.return_value.pw_name = "testuser"
+        mock_getpwnam.return_value.pw_dir = "/home/testuser"
+        with patch.dict(
+            "os.environ",
+            {"PATH": "/usr/bin:/bin", "LANG": "de_DE.UTF-8", "LC_TIME": "C"},
+            clear=True,
+        ):
+            display_report_file("report.html", "html")
+        mock_getpwnam.assert_called_once_with("testuser")
+        mock_subprocess_call.assert_called_once()
+        args, kwargs = mock_subprocess_call.call_args
+        self.assertEqual(args[0], ["xdg-open", "report.html"])
+        self.assertEqual(kwargs["user"], 1000)
+        self.assertEqual(kwargs["group"], 1000)
+        self.assertEqual(kwargs["extra_groups"], [1000, 27])
+        self.assertEqual(kwargs["env"]["HOME"], "/home/testuser")
+        self.assertEqual(kwargs["env"]["DISPLAY"], "foo")
+        self.assertEqual(kwargs["env"]["PATH"], "/usr/bin:/bin")
+        self.assertEqual(kwargs["env"]["LANG"], "de_DE.UTF-8")
+        self.assertEqual(kwargs["env"]["LC_TIME"], "C")
+
+    @patch("amd_debug.s2idle.is_root", return_value=True)
+    @patch("amd_debug.s2idle.pwd.getpwnam", side_effect=KeyError("testuser"))
+    @patch(
+        "os.environ.get",
+        side_effect=lambda key: "testuser" if key == "SUDO_USER" else "foo",
+    )
+    @patch("subprocess.call")
+    def test_display_report_file_html_root_unknown_user(
+        self, mock_subprocess_call, _mock_env_get, _mock_getpwnam, _mock_is_root
+    ):
+        """Test display_report_file falls back to sudo when the user can't be resolved"""
+        display_report_file("report.html", "html")
+        call_args = mock_subprocess_call.call_args[0][0]
+        self.assertEqual(call_args[:4], ["sudo", "-u", "testuser", "env"])
+
     @patch("amd_debug.s2idle.is_root", return_value=True)
     @patch("os.environ.get", side_effect=lambda key: None)
     @patch("builtins.print")
@@ -639,7 +702,7 @@ class TestReportFunction(unittest.TestCase):
     """Test the report function"""
 
     @patch("amd_debug.s2idle.prompt_report_arguments")
-    @patch("amd_debug.s2idle.SleepReport")
+    @patch("amd_debug.sleep_report.SleepReport")
     @patch("amd_debug.s2idle.display_report_file")
     def test_report_success(
         self, mock_display_report_file, mock_sleep_report, mock_prompt_report_arguments
@@ -697,7 +760,8 @@ class TestReportFunction(unittest.TestCase):
 
     @patch("amd_debug.s2idle.prompt_report_arguments")
     @patch(
-        "amd_debug.s2idle.SleepReport", side_effect=sqlite3.OperationalError("DB error")
+        "amd_debug.sleep_report.SleepReport",
+        side_effect=sqlite3.OperationalError("DB error"),
     )
     @patch("builtins.print")
     def test_report_sqlite_error(
@@ -736,7 +800,8 @@ class TestReportFunction(unittest.TestCase):
 
     @patch("amd_debug.s2idle.prompt_report_arguments")
     @patch(
-        "amd_debug.s2idle.SleepReport", side_effect=PermissionError("Permission denied")
+        "amd_debug.sleep_report.SleepReport",
+        side_effect=PermissionError("Permission denied"),
     )
     @patch("builtins.print")
     def test_report_permission_error(
@@ -774,7 +839,7 @@ class TestReportFunction(unittest.TestCase):
         self.assertFalse(result)
 
     @patch("amd_debug.s2idle.prompt_report_arguments")
-    @patch("amd_debug.s2idle.SleepReport")
+    @patch("amd_debug.sleep_report.SleepReport")
     @patch("builtins.print")
     def test_report_run_error(
         self, _mock_print, mock_sleep_report, mock_prompt_report_arguments
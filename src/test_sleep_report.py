@@ -10,21 +10,21 @@ import os
 import tempfile
 import unittest
 from datetime import datetime
-from unittest.mock import patch
+from unittest.mock import patch, Mock
 import pandas as pd
 from markupsafe import Markup
 
 from amd_debug.sleep_report import (
     remove_duplicates,
-    format_gpio_as_str,
-    format_irq_as_str,
+    format_wake_column,
     format_as_human,
-    format_as_seconds,
-    format_watts,
-    format_percent,
+    _parse_ts,
+    _to_datetime_column,
     format_timedelta,
-    parse_hw_sleep,
+    format_timedelta_column,
     SleepReport,
+    _get_environment,
+    _get_template,
 )
 
 from amd_debug.wake import WakeGPIO, WakeIRQ
@@ -38,32 +38,34 @@ class TestSleepReportUtils(unittest.TestCase):
         self.assertEqual(remove_duplicates("1, 2, 2, 3"), [1, 2, 3])
         self.assertEqual(remove_duplicates("4 4 5 6"), [4, 5, 6])
         self.assertEqual(remove_duplicates(""), [])
+        self.assertEqual(remove_duplicates("[9, 2, 9]"), [9, 2])
 
-    def test_format_gpio_as_str(self):
-        """Test the format_gpio_as_str function."""
-        self.assertEqual(format_gpio_as_str("1, 2, 2, 3"), "1, 2, 3")
-        self.assertEqual(format_gpio_as_str("4 4 5 6"), "4, 5, 6")
-        self.assertEqual(format_gpio_as_str(""), "")
+    def test_format_wake_column(self):
+        """Test the format_wake_column function."""
+        column = pd.Series(["1, 2, 2", None, "2", ""])
+        mock_gpio = Mock(wraps=WakeGPIO)
+        self.assertEqual(format_wake_column(column, mock_gpio), ["1, 2", "", "2", ""])
+        self.assertEqual(mock_gpio.call_count, 2)
 
     @patch("amd_debug.wake.read_file")
     @patch("os.path.exists")
     @patch("os.listdir")
     @patch("os.walk")
-    def test_format_irq_as_str(
+    def test_format_wake_column_irq(
         self, _mock_os_walk, _mock_os_listdir, mock_os_path_exists, mock_read_file
     ):
-        """Test the format_irq_as_str function."""
+        """Test format_wake_column names interrupts."""
         mock_read_file.side_effect = lambda path: {
             "/sys/kernel/irq/20/chip_name": "",
             "/sys/kernel/irq/20/actions": "",
             "/sys/kernel/irq/20/wakeup": "disabled",
         }.get(path, "")
-
-        # Mocking os.path.exists
         mock_os_path_exists.return_value = False
-
-        self.assertEqual(format_irq_as_str("20"), "Disabled interrupt")
-        self.assertEqual(format_irq_as_str(""), "")
+        column = pd.Series(["20", "", "20, 20"])
+        self.assertEqual(
+            format_wake_column(column, WakeIRQ),
+            ["Disabled interrupt", "", "Disabled interrupt"],
+        )
 
     def test_format_as_human(self):
         """Test the format_as_human function."""
@@ -73,36 +75,45 @@ class TestSleepReportUtils(unittest.TestCase):
         )
         with self.assertRaises(ValueError):
             format_as_human("invalid_date")
-
-    def test_format_as_seconds(self):
-        """Test the format_as_seconds function."""
-        self.assertEqual(
-            format_as_seconds("20231010123045"),
-            datetime(2023, 10, 10, 12, 30, 45).timestamp(),
-        )
         with self.assertRaises(ValueError):
-            format_as_seconds("invalid_date")
-
-    def test_format_watts(self):
-        """Test the format_watts function."""
-        self.assertEqual(format_watts(12.3456), "12.35W")
-        self.assertEqual(format_watts(0), "0.00W")
-
-    def test_format_percent(self):
-        """Test the format_percent function."""
-        self.assertEqual(format_percent(12.3456), "12.35%")
-        self.assertEqual(format_percent(0), "0.00%")
+            format_as_human("20231310123045")
+
+    def test_to_datetime_column(self):
+        """Test the _to_datetime_column function."""
+        column = pd.Series([20231010123045, 20240229000001], index=[3, 4])
+        result = _to_datetime_column(column)
+        self.assertEqual(list(result.index), [3, 4])
+        self.assertEqual(result[3], pd.Timestamp(2023, 10, 10, 12, 30, 45))
+        self.assertEqual(result[4], pd.Timestamp(2024, 2, 29, 0, 0, 1))
+        column = pd.Series([19991231235959, 20250101000000])
+        result = _to_datetime_column(column)
+        self.assertEqual(result[0], pd.Timestamp(1999, 12, 31, 23, 59, 59))
+        self.assertEqual(result[1], pd.Timestamp(2025, 1, 1))
+
+    def test_format_as_human_cached(self):
+        """Test repeated timestamps are only parsed once."""
+        _parse_ts.cache_clear()
+        first = format_as_human(20231010123045)
+        second = format_as_human("20231010123045")
+        self.assertIs(first, second)
+        self.assertEqual(_parse_ts.cache_info().hits, 1)
 
     def test_format_timedelta(self):
         """Test the format_timedelta function."""
         self.assertEqual(format_timedelta(3600), "1:00:00")
         self.assertEqual(format_timedelta(3661), "1:01:01")
 
-    def test_parse_hw_sleep(self):
-        """Test the parse_hw_sleep function."""
-        self.assertEqual(parse_hw_sleep(0.5), 50)
-        self.assertEqual(parse_hw_sleep(1.0), 100)
-        self.assertEqual(parse_hw_sleep(1.5), 0)
+    def test_format_timedelta_column(self):
+        """Test the format_timedelta_column function."""
+        values = [0, 59, 3661, 86400, 90061, 172800, float("nan"), 1.5]
+        self.assertEqual(
+            list(format_timedelta_column(pd.Series(values))),
+            [format_timedelta(val) for val in values],
+        )
+        self.assertEqual(
+            list(format_timedelta_column(pd.Series(values[:-1]))),
+            [format_timedelta(val) for val in values[:-1]],
+        )
 
 
 class TestSleepReport(unittest.TestCase):
@@ -111,6 +122,10 @@ class TestSleepReport(unittest.TestCase):
     @patch("amd_debug.sleep_report.SleepDatabase")
     def setUp(self, MockSleepDatabase):
         """Set up a mock SleepReport instance for testing."""
+        _get_environment.cache_clear()
+        _get_template.cache_clear()
+        self.addCleanup(_get_environment.cache_clear)
+        self.addCleanup(_get_template.cache_clear)
         self.mock_db = MockSleepDatabase.return_value
         self.mock_db.report_summary_dataframe.return_value = pd.DataFrame(
             {
@@ -181,6 +196,123 @@ class TestSleepReport(unittest.TestCase):
                     self.assertEqual(uid, 1000)
                     self.assertEqual(gid, 1000)
 
+    @patch("amd_debug.sleep_report.Environment")
+    @patch("amd_debug.sleep_report.FileSystemLoader")
+    def test_build_template_streams_to_file(self, _mock_fsl, mock_env):
+        """Test the report is streamed to the file rather than rendered."""
+        mock_template = mock_env.return_value.get_template.return_value
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "report.txt")
+            self.report.fname = fname
+            result = self.report.build_template(inc_prereq=False)
+
+        self.assertEqual(result, f"Report written to {fname}")
+        mock_template.stream.return_value.dump.assert_called_once()
+        mock_template.render.assert_not_called()
+
+    @patch("amd_debug.sleep_report.Environment")
+    @patch("amd_debug.sleep_report.FileSystemLoader")
+    def test_build_template_cached(self, _mock_fsl, mock_env):
+        """Test the template is only loaded once for repeated reports."""
+        mock_template = mock_env.return_value.get_template.return_value
+        mock_template.render.return_value = "Rendered Template"
+        self.report.df = pd.DataFrame()
+        self.report.build_template(inc_prereq=False)
+        self.report.build_template(inc_prereq=False)
+        mock_env.assert_called_once()
+        mock_env.return_value.get_template.assert_called_once_with("txt")
+
+    @patch("amd_debug.sleep_report.SleepDatabase")
+    def test_stdout_only_processes_last_cycle(self, mock_db):
+        """Test stdout reports only pre-process the cycle that is shown."""
+        mock_db.return_value.report_summary_dataframe.return_value = pd.DataFrame(
+            {
+                "t0": ["20231010120000", "20231010130000"],
+                "t1": ["20231010120010", "20231010133000"],
+                "hw": [0, 1700],
+                "requested": [60, 1],
+                "gpio": ["1", "2"],
+                "wake_irq": ["", ""],
+                "b0": [None, None],
+                "b1": [None, None],
+                "full": [None, None],
+            }
+        )
+        report = SleepReport(
+            since=self.since,
+            until=self.until,
+            fname=None,
+            fmt="stdout",
+            tool_debug=False,
+            report_debug=False,
+        )
+        self.assertEqual(list(report.df.index), [1])
+        self.assertEqual(report.failures, [])
+
+    @patch("amd_debug.sleep_report.SleepDatabase")
+    def test_load_reuses_database(self, mock_db):
+        """Test loading a new range keeps the same database connection."""
+        mock_db.return_value.report_summary_dataframe.return_value = (
+            self.mock_db.report_summary_dataframe.return_value
+        )
+        report = SleepReport(
+            since=None,
+            until=None,
+            fname=None,
+            fmt="stdout",
+            tool_debug=False,
+            report_debug=False,
+        )
+        self.assertTrue(report.df.empty)
+        report.failures.append("stale")
+        report.load(self.since, self.until)
+        mock_db.assert_called_once()
+        mock_db.return_value.report_summary_dataframe.assert_called_once_with(
+            self.since, self.until
+        )
+        self.assertEqual(report.since, self.since)
+        self.assertEqual(len(report.df.index), 1)
+        self.assertNotIn("stale", report.failures)
+
+    def test_convert_table_dataframe(self):
+        """Test table debug messages are converted to HTML as plain text."""
+        content = 'DMI|value\nbios_version|007\nproduct_name|"X" N/A\n'
+        result = self.report.convert_table_dataframe(content)
+        self.assertIn(">DMI</th>", result)
+        self.assertIn("<td>007</td>", result)
+        self.assertIn('<td>"X" N/A</td>', result)
+
+    @patch("matplotlib.pyplot.close")
+    @patch("matplotlib.pyplot.savefig", side_effect=OSError("disk full"))
+    def test_build_chart_closes_figure_on_error(self, _mock_savefig, mock_close):
+        """Test the chart figure is released even if rendering fails."""
+        with self.assertRaises(OSError):
+            self.report.build_hw_sleep_chart()
+        mock_close.assert_called_once()
+
+    def test_get_cycle_data_limit(self):
+        """Test only the cycles in the limit are fetched from the database."""
+        self.report.df = pd.DataFrame({"Start Time": ["a", "b", "c"]})
+        self.mock_db.report_cycle_data_bulk.return_value = {"c": "last cycle"}
+        cycles, debug = self.report.get_cycle_data(slice(-1, None))
+        self.mock_db.report_cycle_data_bulk.assert_called_once_with(["c"])
+        self.assertEqual(cycles, [[2, "last cycle"]])
+        self.assertEqual(debug, [])
+
+    def test_get_cycle_data_without_debug(self):
+        """Test cycle data is fetched once and debug data is skipped."""
+        self.report.df = pd.DataFrame({"Start Time": ["a", "b"]})
+        self.mock_db.reset_mock()
+        self.mock_db.report_cycle_data_bulk.return_value = {"a": "one", "b": "two"}
+        cycles, debug = self.report.get_cycle_data()
+        self.assertEqual(cycles, [[0, "one"], [1, "two"]])
+        self.assertEqual(debug, [])
+        self.mock_db.report_cycle_data_bulk.assert_called_once()
+        self.mock_db.report_cycle_data.assert_not_called()
+        self.mock_db.report_debug_bulk.assert_not_called()
+        self.mock_db.report_power_rails_bulk.assert_not_called()
+
     @patch("matplotlib.pyplot.savefig")
     def test_build_battery_chart(self, mock_savefig):
         """Test the build_battery_chart method."""
@@ -195,6 +327,13 @@ class TestSleepReport(unittest.TestCase):
         self.assertIsNotNone(self.report.hwsleep_svg)
         mock_savefig.assert_called_once()
 
+    @patch("matplotlib.pyplot.close")
+    def test_build_charts_close_figures(self, mock_close):
+        """Test the chart figures are released once rendered."""
+        self.report.build_battery_chart()
+        self.report.build_hw_sleep_chart()
+        self.assertEqual(mock_close.call_count, 2)
+
     def test_pre_process_dataframe_zero_duration(self):
         """Test the pre_process_dataframe method when t0 and t1 are the same."""
         # Mock the dataframe with t0 and t1 being the same
@@ -223,6 +362,25 @@ class TestSleepReport(unittest.TestCase):
             math.isnan(self.report.df["Hardware Sleep"].iloc[0])
         )  # Hardware Sleep should be NaN
 
+    def test_pre_process_dataframe_hw_sleep(self):
+        """Test the pre_process_dataframe Hardware Sleep percentage."""
+        self.report.df = pd.DataFrame(
+            {
+                "t0": ["20231010120000", "20231010120000"],
+                "t1": ["20231010120100", "20231010120100"],
+                "hw": [30, 90],
+                "requested": [1, 1],
+                "gpio": ["", ""],
+                "wake_irq": ["", ""],
+                "b0": [None, None],
+                "b1": [None, None],
+                "full": [None, None],
+            }
+        )
+        self.report.pre_process_dataframe()
+        # more hardware sleep than suspend time is garbage and thrown out
+        self.assertEqual(list(self.report.df["Hardware Sleep"]), [50.0, 0.0])
+
     def test_battery_ave_rate(self):
         """Test the pre_process_dataframe Average Power calculation."""
         self.report.df = pd.DataFrame(
@@ -242,6 +400,47 @@ class TestSleepReport(unittest.TestCase):
         batt_ave_rate = self.report.df["Average Power"].iloc[0]
         self.assertAlmostEqual(batt_ave_rate, -5, places=3)
 
+    def test_pre_process_dataframe_failures(self):
+        """Test only cycles with a possible failure are analyzed."""
+        self.report.df = pd.DataFrame(
+            {
+                "t0": ["20231010120000", "20231010130000", "20231010140000"],
+                "t1": ["20231010120500", "20231010130500", "20231010140005"],
+                "hw": [299, 100, 5],
+                "requested": [300, 300, 60],
+                "gpio": ["", "", ""],
+                "wake_irq": ["", "", ""],
+                "b0": [None, None, None],
+                "b1": [None, None, None],
+                "full": [None, None, None],
+            }
+        )
+        self.report.failures = []
+        with patch.object(
+            self.report, "analyze_duration", wraps=self.report.analyze_duration
+        ) as mock_analyze:
+            self.report.pre_process_dataframe()
+        self.assertEqual([c.args[0] for c in mock_analyze.call_args_list], [1, 2])
+        self.assertEqual([f[0] for f in self.report.failures], [1, 2])
+
+    def test_post_process_dataframe(self):
+        """Test the post_process_dataframe formatting."""
+        self.report.df = pd.DataFrame(
+            {
+                "Duration": [3661.0, float("nan")],
+                "Hardware Sleep": [12.3456, float("nan")],
+                "Battery Start": [90.0, 80.004],
+                "Battery Delta": [-1.5, 0.0],
+                "Average Power": [1.234, 0.0],
+            }
+        )
+        self.report.post_process_dataframe()
+        self.assertEqual(list(self.report.df["Duration"]), ["1:01:01", "0:00:00"])
+        self.assertEqual(list(self.report.df["Hardware Sleep"]), ["12.35%", "nan%"])
+        self.assertEqual(list(self.report.df["Battery Start"]), ["90.00%", "80.00%"])
+        self.assertEqual(list(self.report.df["Battery Delta"]), ["-1.50%", "0.00%"])
+        self.assertEqual(list(self.report.df["Average Power"]), ["1.23W", "0.00W"])
+
     def test_get_prereq_data_preserves_markup_for_html_tables(self):
         """Ensure HTML prerequisite tables remain Markup and are not escaped."""
         self.report.format = "html"
@@ -46,15 +46,17 @@ class TestMainFunction(unittest.TestCase):
     """Test main() function logic"""
 
     @mock.patch("amd_debug.ttm.parse_args")
+    @mock.patch("amd_debug.ttm.AmdTtmTool")
     @mock.patch("amd_debug.ttm.version", return_value="1.2.3")
     @mock.patch("builtins.print")
-    def test_main_version(self, mock_print, _mock_version, mock_parse_args):
+    def test_main_version(self, mock_print, _mock_version, mock_tool, mock_parse_args):
         """Test main function with version argument"""
         mock_parse_args.return_value = mock.Mock(
             version=True, set=None, clear=False, tool_debug=False
         )
         ret = main()
         mock_print.assert_called_with("1.2.3")
+        mock_tool.assert_not_called()
         self.assertIsNone(ret)
 
     @mock.patch("amd_debug.ttm.parse_args")
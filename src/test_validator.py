@@ -7,14 +7,19 @@ This module contains unit tests for the validator functions in the amd-debug-too
 
 from unittest.mock import patch, mock_open, Mock, MagicMock
 
+import contextlib
 import os
+import sys
 import logging
 import subprocess
+import tempfile
 import unittest
 import math
 from datetime import datetime, timedelta
+from packaging import version
 
 from amd_debug.validator import (
+    batch_scheduling,
     pm_debugging,
     soc_needs_irq1_wa,
     SleepValidator,
@@ -42,6 +47,42 @@ class TestValidatorHelpers(unittest.TestCase):
         ret = soc_needs_irq1_wa(0x19, 0x50, "64.66.0")
         self.assertFalse(ret)
 
+    def test_soc_needs_irq1_wa_cached(self):
+        """Versions are only parsed on the first check for a SoC"""
+        soc_needs_irq1_wa.cache_clear()
+        with patch("packaging.version.parse", side_effect=version.parse) as mock_parse:
+            self.assertFalse(soc_needs_irq1_wa(0x19, 0x50, "64.70.0"))
+            self.assertFalse(soc_needs_irq1_wa(0x19, 0x50, "64.70.0"))
+        mock_parse.assert_any_call("64.70.0")
+        self.assertEqual(mock_parse.call_count, 2)
+        soc_needs_irq1_wa.cache_clear()
+
+    @patch("os.sched_setaffinity")
+    @patch("os.sched_setscheduler")
+    @patch("os.sched_getparam", return_value=os.sched_param(0))
+    @patch("os.sched_getscheduler", return_value=os.SCHED_OTHER)
+    @patch("os.sched_getaffinity", return_value={2, 3})
+    def test_batch_scheduling(
+        self, _mock_aff, _mock_policy, _mock_param, mock_setsched, mock_setaff
+    ):
+        """Data collection runs pinned as a batch task and is restored after"""
+        with batch_scheduling():
+            mock_setaff.assert_called_once_with(0, {2})
+            mock_setsched.assert_called_once_with(0, os.SCHED_BATCH, os.sched_param(0))
+        mock_setsched.assert_called_with(0, os.SCHED_OTHER, os.sched_param(0))
+        mock_setaff.assert_called_with(0, {2, 3})
+
+    @patch("os.sched_setaffinity")
+    @patch("os.sched_setscheduler", side_effect=PermissionError)
+    @patch("os.sched_getaffinity", return_value={0, 1})
+    def test_batch_scheduling_not_permitted(self, _mock_aff, _mock_sched, mock_setaff):
+        """A scheduler that can't be changed doesn't stop data collection"""
+        ran = []
+        with batch_scheduling():
+            ran.append(True)
+        self.assertEqual(ran, [True])
+        mock_setaff.assert_called_with(0, {0, 1})
+
     def test_pm_debugging(self):
         """Test pm_debugging decorator"""
 
@@ -50,7 +91,9 @@ class TestValidatorHelpers(unittest.TestCase):
             return "Test function executed"
 
         # Mock /sys/power/pm_debug_messages existing and all ACPI existing
-        with patch("amd_debug.validator.open", new_callable=mock_open, read_data="0") as mock_file:
+        with patch(
+            "amd_debug.validator.open", new_callable=mock_open, read_data="0"
+        ) as mock_file:
             handlers = (
                 mock_file.return_value,
                 mock_open(read_data="0").return_value,
@@ -81,25 +124,47 @@ class TestValidator(unittest.TestCase):
     def setUp(self, _db_mock, _mock_run):
         """Set up a mock context for testing"""
         self.validator = SleepValidator(tool_debug=True, bios_debug=False)
+        # don't let patches started by a failing test leak into the next one
+        self.addCleanup(patch.stopall)
 
     def test_capture_running_compositors(self):
         """Test capture_running_compositors method"""
-        with patch("glob.glob", return_value=["/proc/1234", "/proc/5678"]), patch(
-            "os.path.exists", return_value=True
-        ), patch(
-            "os.readlink", side_effect=["/usr/bin/kwin_wayland", "/usr/bin/gnome-shell"]
-        ), patch.object(
-            self.validator.db, "record_debug"
-        ) as mock_record_debug:
-            self.validator.capture_running_compositors()
-            mock_record_debug.assert_any_call("kwin_wayland compositor is running")
-            mock_record_debug.assert_any_call("gnome-shell compositor is running")
+        with tempfile.TemporaryDirectory() as proc:
+            for pid, exe in [
+                ("1234", "/usr/bin/kwin_wayland"),
+                ("5678", "/usr/bin/gnome-shell"),
+                ("91", "/usr/bin/bash"),
+            ]:
+                os.mkdir(os.path.join(proc, pid))
+                os.symlink(exe, os.path.join(proc, pid, "exe"))
+            # kernel threads have no exe link, non-pid entries are ignored
+            os.mkdir(os.path.join(proc, "2"))
+            os.symlink("/usr/bin/hyprland", os.path.join(proc, "self"))
+            with patch(
+                "os.scandir", return_value=os.scandir(proc)
+            ) as mock_scandir, patch.object(
+                self.validator.db, "record_debug"
+            ) as mock_record_debug:
+                self.validator.capture_running_compositors()
+                # later cycles record the same compositors without a rescan
+                self.validator.capture_running_compositors()
+        mock_scandir.assert_called_once()
+        self.assertEqual(
+            sorted(c.args[0] for c in mock_record_debug.call_args_list),
+            [
+                "gnome-shell compositor is running",
+                "gnome-shell compositor is running",
+                "kwin_wayland compositor is running",
+                "kwin_wayland compositor is running",
+            ],
+        )
 
     def test_capture_power_profile(self):
         """Test capture_power_profile method"""
+        proc = MagicMock(returncode=0)
+        proc.communicate.return_value = ("Performance\nBalanced\nPower Saver", None)
         with patch("os.path.exists", return_value=True), patch(
-            "subprocess.check_output",
-            return_value=b"Performance\nBalanced\nPower Saver",
+            "subprocess.Popen", return_value=proc
         ), patch.object(self.validator.db, "record_debug") as mock_record_debug:
             self.validator.capture_power_profile()
             mock_record_debug.assert_any_call("Power Profiles:")
@@ -107,6 +172,28 @@ class TestValidator(unittest.TestCase):
             mock_record_debug.assert_any_call("│ Balanced")
             mock_record_debug.assert_any_call("└─Power Saver")
 
+    def test_capture_power_profile_repeated_lines(self):
+        """Only the last line closes the tree, even if earlier lines repeat it"""
+        proc = MagicMock(returncode=0)
+        proc.communicate.return_value = (
+            "  balanced:\n    Degraded:   no\n  power-saver:\n    Degraded:   no",
+            None,
+        )
+        with patch("os.path.exists", return_value=True), patch(
+            "subprocess.Popen", return_value=proc
+        ), patch.object(self.validator.db, "record_debug") as mock_record_debug:
+            self.validator.capture_power_profile()
+        self.assertEqual(
+            [c.args[0] for c in mock_record_debug.call_args_list],
+            [
+                "Power Profiles:",
+                "│ balanced:",
+                "│ Degraded:   no",
+                "│ power-saver:",
+                "└─Degraded:   no",
+            ],
+        )
+
     def test_capture_battery(self):
         """Test capture_battery method"""
         with patch.object(
@@ -146,11 +233,9 @@ class TestValidator(unittest.TestCase):
 
         # Mock wakeup devices
         mock_wakeup_device = mock_pyudev.list_devices.return_value = [
-            unittest.mock.Mock(
-                sys_path="/sys/devices/pci0000:00/0000:00:14.0",
-                find_parent=lambda subsystem, **kwargs: None,
-            )
+            unittest.mock.Mock(sys_path="/sys/devices/pci0000:00/0000:00:14.0")
         ]
+        mock_wakeup_device[0].parent = None
 
         # Mock wakeup file existence and content
         mock_os_path_exists.return_value = True
@@ -170,19 +255,159 @@ class TestValidator(unittest.TestCase):
         # Stop patches
         patch.stopall()
 
+    def test_capture_wake_sources_walks_parents_once(self):
+        """Wakeup sources are classified from a single walk of their parents"""
+        # "parent" is a Mock constructor argument, so chain devices afterwards
+        pci = MagicMock(sys_name="0000:00:08.1", subsystem="pci")
+        pci.properties = {"PCI_CLASS": "0x0c0330"}
+        pci.parent = None
+        hid = MagicMock(sys_name="0018:04F3:3140.0001", subsystem="hid")
+        hid.properties = {"HID_NAME": "ELAN"}
+        hid.parent = pci
+        # only the nearest parent of a subsystem is used
+        outer_hid = MagicMock(sys_name="outer", subsystem="hid")
+        outer_hid.properties = {"HID_NAME": "Outer"}
+        outer_hid.parent = hid
+        wake_dev = MagicMock(sys_path="/sys/devices/wakeup/wakeup0")
+        wake_dev.parent = outer_hid
+        domain = MagicMock(
+            sys_name="domain0",
+            subsystem="thunderbolt",
+            device_type="thunderbolt_domain",
+        )
+        domain.parent = None
+        tbt_wake = MagicMock(sys_path="/sys/devices/wakeup/wakeup1")
+        tbt_wake.parent = domain
+        with patch.object(self.validator, "pyudev") as mock_pyudev, patch(
+            "os.path.exists", return_value=True
+        ), patch("amd_debug.validator.read_file", return_value="enabled"), patch.object(
+            self.validator.db, "record_debug"
+        ) as mock_record:
+            mock_pyudev.list_devices.return_value = [wake_dev, tbt_wake]
+            self.validator.capture_wake_sources()
+        mock_record.assert_called_once_with(
+            "Wakeup Source|Linux Device|Status\n"
+            "Outer|outer|enabled\n"
+            "Thunderbolt domain|domain0|enabled\n"
+        )
+        wake_dev.find_parent.assert_not_called()
+
+    def test_capture_wake_sources_indexes_children_once(self):
+        """Sibling devices are looked up from one scan per subsystem"""
+        devices = []
+        for sys_name in ("PNP0C0D:00", "PNP0C0C:00"):
+            acpi = MagicMock(
+                sys_name=sys_name,
+                sys_path=f"/sys/devices/LNXSYSTM:00/{sys_name}",
+                subsystem="acpi",
+                driver="button",
+            )
+            acpi.parent = None
+            wake_dev = MagicMock(sys_path=f"/sys/devices/wakeup/{sys_name}")
+            wake_dev.parent = acpi
+            devices.append(wake_dev)
+        lid = MagicMock(sys_path="/sys/devices/LNXSYSTM:00/PNP0C0D:00/input/input1")
+        lid.properties = {"NAME": "Lid Switch"}
+        power = MagicMock(sys_path="/sys/devices/LNXSYSTM:00/PNP0C0C:00/input/input2")
+        power.properties = {"NAME": "Power Button"}
+
+        def list_devices(subsystem, **kwargs):
+            if subsystem == "wakeup":
+                return devices
+            if subsystem == "input":
+                return [lid, power]
+            return []
+
+        with patch.object(self.validator, "pyudev") as mock_pyudev, patch(
+            "amd_debug.validator.read_file", return_value="enabled"
+        ), patch.object(self.validator.db, "record_debug") as mock_record:
+            mock_pyudev.list_devices.side_effect = list_devices
+            self.validator.capture_wake_sources()
+        mock_record.assert_called_once_with(
+            "Wakeup Source|Linux Device|Status\n"
+            "ACPI Lid Switch|PNP0C0D:00|enabled\n"
+            "ACPI Power Button|PNP0C0C:00|enabled\n"
+        )
+        self.assertEqual(mock_pyudev.list_devices.call_count, 2)
+
+    def test_capture_wake_sources_skips_missing_wakeup(self):
+        """Wakeup sources without a power/wakeup attribute are skipped"""
+        wake_dev = MagicMock(sys_path="/sys/devices/wakeup/wakeup1")
+        with patch.object(self.validator, "pyudev") as mock_pyudev, patch(
+            "amd_debug.validator.read_file", side_effect=FileNotFoundError
+        ), patch.object(self.validator.db, "record_debug") as mock_record:
+            mock_pyudev.list_devices.return_value = [wake_dev]
+            self.validator.capture_wake_sources()
+        mock_record.assert_called_once_with("Wakeup Source|Linux Device|Status\n")
+        wake_dev.find_parent.assert_not_called()
+
+    @staticmethod
+    def _fake_scandir(tree):
+        """Build an os.scandir replacement serving a fixed directory tree"""
+
+        def scandir(path):
+            if path not in tree:
+                raise FileNotFoundError(path)
+            entries = []
+            for name in tree[path]:
+                child = f"{path}/{name}"
+                entry = MagicMock(path=child)
+                entry.name = name
+                entry.is_dir.return_value = child in tree
+                entry.is_file.return_value = child not in tree
+                entries.append(entry)
+            return contextlib.nullcontext(entries)
+
+        return scandir
+
     def test_capture_lid(self):
         """Test capture_lid method"""
-        with patch("os.walk", return_value=[("/", [], ["lid0", "lid1"])]), patch(
-            "os.path.join", side_effect=lambda *args: "/".join(args)
-        ), patch(
+        tree = {
+            "/proc/acpi/button/lid": ["LID0", "LID1"],
+            "/proc/acpi/button/lid/LID0": ["state"],
+            "/proc/acpi/button/lid/LID1": ["state"],
+        }
+        with patch("os.scandir", side_effect=self._fake_scandir(tree)), patch(
             "amd_debug.validator.read_file",
             side_effect=["state: open", "state: closed"],
+        ), patch.object(self.validator.db, "record_debug") as mock_record_debug:
+            self.validator.capture_lid()
+            mock_record_debug.assert_any_call(
+                "ACPI Lid (/proc/acpi/button/lid/LID0/state): open"
+            )
+            mock_record_debug.assert_any_call(
+                "ACPI Lid (/proc/acpi/button/lid/LID1/state): closed"
+            )
+
+    def test_capture_lid_missing(self):
+        """Systems without a lid record nothing"""
+        with patch("os.scandir", side_effect=FileNotFoundError), patch.object(
+            self.validator.db, "record_debug"
+        ) as mock_record_debug:
+            self.validator.capture_lid()
+        mock_record_debug.assert_not_called()
+        self.assertEqual(self.validator.lid_paths, [])
+
+    def test_capture_lid_walks_once(self):
+        """Later cycles re-read the lid state without walking /proc again"""
+        tree = {
+            "/proc/acpi/button/lid": ["LID0"],
+            "/proc/acpi/button/lid/LID0": ["state"],
+        }
+        with patch(
+            "os.scandir", side_effect=self._fake_scandir(tree)
+        ) as mock_scandir, patch(
+            "amd_debug.validator.read_file",
+            side_effect=["state:      open", "state:      closed"],
         ), patch.object(
             self.validator.db, "record_debug"
         ) as mock_record_debug:
             self.validator.capture_lid()
-            mock_record_debug.assert_any_call("ACPI Lid (//lid0): open")
-            mock_record_debug.assert_any_call("ACPI Lid (//lid1): closed")
+            self.validator.capture_lid()
+        self.assertEqual(mock_scandir.call_count, 2)
+        mock_record_debug.assert_called_with(
+            "ACPI Lid (/proc/acpi/button/lid/LID0/state): closed"
+        )
 
     def test_capture_wakeup_irq_data(self):
         """Test capture_wakeup_irq_data method"""
@@ -246,7 +471,6 @@ class TestValidator(unittest.TestCase):
         mock_pyudev = patch.object(self.validator, "pyudev").start()
         mock_record_debug = patch.object(self.validator.db, "record_debug").start()
         mock_read_file = patch("amd_debug.validator.read_file").start()
-        mock_os_path_exists = patch("os.path.exists").start()
 
         # Mock input devices
         mock_device = unittest.mock.Mock()
@@ -254,10 +478,7 @@ class TestValidator(unittest.TestCase):
         mock_device.parent = None
         mock_pyudev.list_devices.return_value = [mock_device]
 
-        # Mock wakeup file existence and content
-        mock_os_path_exists.side_effect = (
-            lambda path: "wakeup" in path or "wakeup_count" in path
-        )
+        # Mock wakeup file content
         mock_read_file.side_effect = ["5"]  # Wakeup count
 
         # Set initial wakeup count
@@ -287,6 +508,15 @@ class TestValidator(unittest.TestCase):
             self.assertEqual(self.validator.hw_sleep_duration, 1.0)
             mock_record_cycle_data.assert_not_called()
 
+    def test_capture_hw_sleep_checks_suspend_stats_once(self):
+        """The suspend_stats interface is only looked up on the first cycle"""
+        with patch("os.path.exists", return_value=True) as mock_exists, patch(
+            "amd_debug.validator.read_file", return_value="1000000"
+        ):
+            self.assertTrue(self.validator.capture_hw_sleep())
+            self.assertTrue(self.validator.capture_hw_sleep())
+        mock_exists.assert_called_once_with("/sys/power/suspend_stats/last_hw_sleep")
+
     def test_capture_hw_sleep_smu_fw_info(self):
         """Test capture_hw_sleep smu_fw_info method"""
         # Case 2: Suspend stats file does not exist, fallback to smu_fw_info
@@ -360,6 +590,10 @@ class TestValidator(unittest.TestCase):
         mock_record_debug.assert_any_call("│ IPS Enabled")
         mock_record_debug.assert_any_call("└─IPS Level: 2")
 
+        # The GPU list is reused by later cycles
+        self.validator.capture_amdgpu_ips_status()
+        mock_pyudev.list_devices.assert_called_once()
+
         # Case 2: IPS status file does not exist
         mock_os_path_exists.return_value = False
         self.validator.capture_amdgpu_ips_status()
@@ -428,6 +662,8 @@ class TestValidator(unittest.TestCase):
     def test_prep(self):
         """Test prep method"""
         with patch("amd_debug.validator.datetime") as mock_datetime, patch.object(
+            self.validator, "_spawn_power_profile"
+        ) as mock_spawn, patch.object(
             self.validator.kernel_log, "seek_tail"
         ) as mock_seek_tail, patch.object(
             self.validator.db, "start_cycle"
@@ -473,10 +709,10 @@ class TestValidator(unittest.TestCase):
             mock_capture_command_line.assert_called_once()
             mock_capture_wake_sources.assert_called_once()
             mock_capture_running_compositors.assert_called_once()
-            mock_capture_power_profile.assert_called_once()
+            mock_capture_power_profile.assert_called_once_with(mock_spawn.return_value)
             mock_capture_amdgpu_ips_status.assert_called_once()
             mock_capture_thermal.assert_called_once()
-            mock_capture_input_wakeup_count.assert_called_once()
+            mock_capture_input_wakeup_count.assert_called_once_with(rescan=True)
             mock_trace_bios.assert_called_once()
             mock_trace_notify.assert_not_called()
             mock_record_cycle.assert_called_once()
@@ -512,11 +748,29 @@ class TestValidator(unittest.TestCase):
             mock_capture_power_profile.assert_called_once()
             mock_capture_amdgpu_ips_status.assert_called_once()
             mock_capture_thermal.assert_called_once()
-            mock_capture_input_wakeup_count.assert_called_once()
+            mock_capture_input_wakeup_count.assert_called_once_with(rescan=True)
             mock_trace_bios.assert_not_called()
             mock_trace_notify.assert_called_once()
             mock_record_cycle.assert_called_once()
 
+    def test_prep_reaps_power_profile_on_failure(self):
+        """powerprofilesctl is killed if a capture fails before it is read"""
+        proc = MagicMock(returncode=None)
+        with patch.object(
+            self.validator, "_spawn_power_profile", return_value=proc
+        ), patch.object(self.validator.kernel_log, "seek_tail"), patch.object(
+            self.validator.db, "start_cycle"
+        ), patch.object(
+            self.validator, "capture_battery", side_effect=OSError
+        ), patch.object(
+            self.validator, "capture_power_profile"
+        ) as mock_capture:
+            with self.assertRaises(OSError):
+                self.validator.prep()
+        mock_capture.assert_not_called()
+        proc.kill.assert_called_once()
+        proc.communicate.assert_called_once()
+
     def test_post(self):
         """Test post method"""
         with patch.object(
@@ -561,7 +815,7 @@ class TestValidator(unittest.TestCase):
             # Set attributes for record_cycle
             self.validator.requested_duration = 60
             self.validator.active_gpios = ["GPIO1"]
-            self.validator.wakeup_irqs = ["5"]
+            self.validator.wakeup_irqs = {"5": None}
             self.validator.kernel_duration = 1.5
             self.validator.hw_sleep_duration = 1.0
 
@@ -578,7 +832,7 @@ class TestValidator(unittest.TestCase):
             mock_capture_battery.assert_called_once()
             mock_capture_amdgpu_ips_status.assert_called_once()
             mock_capture_thermal.assert_called_once()
-            mock_capture_input_wakeup_count.assert_called_once()
+            mock_capture_input_wakeup_count.assert_called_once_with()
             mock_acpica_restore.assert_called_once()
 
             # Assert record_cycle was called with correct arguments
@@ -596,7 +850,10 @@ class TestValidator(unittest.TestCase):
         mock_pyudev = patch.object(self.validator, "pyudev").start()
         _mock_record_debug = patch.object(self.validator.db, "record_debug").start()
         mock_print_color = patch("amd_debug.validator.print_color").start()
-        mock_open_file = patch("builtins.open", mock_open()).start()
+        patch("os.path.exists", return_value=True).start()
+        mock_os_open = patch("os.open", return_value=3).start()
+        mock_pwrite = patch("os.pwrite").start()
+        mock_close = patch("os.close").start()
 
         # Case 1: RTC device exists
         mock_device = unittest.mock.Mock()
@@ -606,14 +863,22 @@ class TestValidator(unittest.TestCase):
 
         self.validator.program_wakealarm()
 
-        # Validate file writes
-        mock_open_file.assert_any_call(
-            "/sys/class/rtc/rtc0/wakealarm", "w", encoding="utf-8"
+        # Both writes go through a single open of the wakealarm file
+        mock_os_open.assert_called_once_with(
+            "/sys/class/rtc/rtc0/wakealarm", os.O_WRONLY
+        )
+        self.assertEqual(
+            mock_pwrite.call_args_list,
+            [unittest.mock.call(3, b"0", 0), unittest.mock.call(3, b"+60\n", 0)],
         )
-        mock_open_file().write.assert_any_call("0")
-        mock_open_file().write.assert_any_call("+60\n")
+        mock_close.assert_called_once_with(3)
+
+        # The RTC lookup is cached for later cycles
+        self.validator.program_wakealarm()
+        mock_pyudev.list_devices.assert_called_once_with(subsystem="rtc")
 
         # Case 2: No RTC device found
+        self.validator.wakealarm = None
         mock_pyudev.list_devices.return_value = []
         self.validator.program_wakealarm()
 
@@ -625,7 +890,7 @@ class TestValidator(unittest.TestCase):
         # Stop patches
         patch.stopall()
 
-    @patch("amd_debug.validator.SleepReport")
+    @patch("amd_debug.sleep_report.SleepReport")
     @patch("amd_debug.validator.print_color")
     def test_report_cycle(self, mock_print_color, mock_sleep_report):
         """Test report_cycle method"""
@@ -656,6 +921,15 @@ class TestValidator(unittest.TestCase):
         # Assert run method of SleepReport was called
         mock_report_instance.run.assert_called_once_with(inc_prereq=False)
 
+        # Later cycles reload the same report instead of building a new one
+        self.validator.last_suspend = "next_suspend"
+        self.validator.report_cycle()
+        mock_sleep_report.assert_called_once()
+        mock_report_instance.load.assert_called_once_with(
+            "next_suspend", "next_suspend"
+        )
+        self.assertEqual(mock_report_instance.run.call_count, 2)
+
     @patch("amd_debug.validator.run_countdown")
     @patch("amd_debug.validator.random.randint")
     @patch("amd_debug.validator.datetime")
@@ -695,6 +969,9 @@ class TestValidator(unittest.TestCase):
         # Test case 2: logind is True
         self.validator.run(duration=10, count=1, wait=5, rand=False, logind=True)
         self.assertTrue(self.validator.logind)
+        self.assertEqual(self.validator.requested_duration, 10)
+        mock_run_countdown.assert_any_call("Suspending system", math.ceil(5 / 2))
+        mock_run_countdown.assert_any_call("Collecting data", math.ceil(5 / 2))
 
         # Test case 3: Randomized test
         mock_randint.side_effect = [7, 3]  # Random duration and wait
@@ -790,10 +1067,14 @@ class TestValidator(unittest.TestCase):
         mock_os_write.side_effect = OSError("Failed to write to state")
 
         # Call the method
-        result = self.validator.suspend_system()
+        with patch.object(self.validator.db, "record_cycle_data") as mock_record:
+            result = self.validator.suspend_system()
 
         # Assert the method returned False
         self.assertFalse(result)
+        mock_record.assert_called_once_with(
+            "Failed to set suspend state (3 -> 3): Failed to write to state", "❌"
+        )
 
         # Assert os.open and os.write were called
         mock_os_open.assert_called_once_with(
@@ -908,32 +1189,59 @@ class TestValidator(unittest.TestCase):
             toggle_pm_debug(False)
             m().write.assert_called_with("0")
 
-    def test_capture_running_compositors_skips_missing_exe(self):
-        """capture_running_compositors skips processes without exe link"""
-        with patch("glob.glob", return_value=["/proc/100", "/proc/200"]), patch(
-            "os.path.exists", side_effect=lambda p: p == "/proc/200/exe"
-        ), patch("os.readlink", return_value="/usr/bin/hyprland"), patch.object(
+    def test_capture_running_compositors_unreadable_exe(self):
+        """capture_running_compositors skips processes whose exe can't be read"""
+        entries = [MagicMock(path="/proc/100"), MagicMock(path="/proc/200")]
+        entries[0].name = "100"
+        entries[1].name = "200"
+        scandir = MagicMock()
+        scandir.__enter__.return_value = entries
+        with patch("os.scandir", return_value=scandir), patch(
+            "os.readlink", side_effect=[PermissionError, "/usr/bin/hyprland"]
+        ) as mock_readlink, patch.object(
             self.validator.db, "record_debug"
         ) as mock_record:
             self.validator.capture_running_compositors()
             mock_record.assert_called_once_with("hyprland compositor is running")
+        mock_readlink.assert_called_with("/proc/200/exe")
 
-    def test_capture_power_profile_called_process_error(self):
-        """capture_power_profile records debug on CalledProcessError"""
-        err = subprocess.CalledProcessError(1, "powerprofilesctl", output=b"oops")
+    def test_capture_power_profile_failure(self):
+        """capture_power_profile records debug when powerprofilesctl fails"""
+        proc = MagicMock(returncode=1)
+        proc.communicate.return_value = ("oops", None)
         with patch("os.path.exists", return_value=True), patch(
-            "subprocess.check_output", side_effect=err
+            "subprocess.Popen", return_value=proc
         ), patch.object(self.validator.db, "record_debug") as mock_record:
             self.validator.capture_power_profile()
             mock_record.assert_called_once()
             self.assertIn("Failed to run", mock_record.call_args[0][0])
+            self.assertIn("oops", mock_record.call_args[0][0])
+
+    def test_capture_power_profile_timeout(self):
+        """A hung powerprofilesctl is killed instead of stalling the cycle"""
+        proc = MagicMock()
+        proc.communicate.side_effect = [
+            subprocess.TimeoutExpired("powerprofilesctl", 5),
+            ("", None),
+        ]
+        with patch.object(self.validator.db, "record_debug") as mock_record:
+            self.validator.capture_power_profile(proc)
+        proc.kill.assert_called_once()
+        mock_record.assert_called_once_with("Timed out waiting for powerprofilesctl")
+
+    def test_capture_power_profile_missing(self):
+        """capture_power_profile does nothing without powerprofilesctl"""
+        with patch("os.path.exists", return_value=False), patch(
+            "subprocess.Popen"
+        ) as mock_popen, patch.object(self.validator.db, "record_debug") as mock_record:
+            self.validator.capture_power_profile()
+            mock_popen.assert_not_called()
+            mock_record.assert_not_called()
 
     def test_capture_power_rails_empty(self):
         """capture_power_rails returns early when no rails detected"""
         self.validator.power_rails.rails = []
-        with patch.object(
-            self.validator.db, "record_power_rail_energy"
-        ) as mock_record:
+        with patch.object(self.validator.db, "record_power_rail_energy") as mock_record:
             self.validator.capture_power_rails()
             mock_record.assert_not_called()
 
@@ -949,19 +1257,58 @@ class TestValidator(unittest.TestCase):
 
     def test_check_gpes_tracks_changes(self):
         """check_gpes reads gpe files and reports increases"""
-        # populate prior counts so a change is detected
-        self.validator.gpes = {"gpe01": 1}
-        m = mock_open(read_data="2")
-        with patch(
-            "os.walk",
-            return_value=[("/sys/firmware/acpi/interrupts", [], ["gpe01", "gpe_all", "irq"])],
-        ), patch("amd_debug.validator.open", m, create=True), patch.object(
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for fname in ["gpe01", "gpe_all", "irq"]:
+                with open(os.path.join(tmpdir, fname), "w", encoding="utf-8") as w:
+                    w.write("       1  EN     enabled      unmasked\n")
+            with patch("os.scandir", return_value=os.scandir(tmpdir)), patch.object(
+                self.validator.db, "record_debug"
+            ) as mock_record:
+                self.validator.check_gpes()
+                mock_record.assert_not_called()
+                self.assertEqual(list(self.validator.gpe_fds), ["gpe01"])
+
+                # the cached descriptor is re-read on the next check
+                with open(os.path.join(tmpdir, "gpe01"), "w", encoding="utf-8") as w:
+                    w.write("       2  EN     enabled      unmasked\n")
+                self.validator.check_gpes()
+            mock_record.assert_called_once()
+            self.assertIn("gpe01 increased from 1 to 2", mock_record.call_args[0][0])
+            self.assertEqual(self.validator.gpes["gpe01"], 2)
+
+    def test_read_sysfs_reuses_descriptor(self):
+        """_read_sysfs keeps the file open and re-reads it from the start"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "temp")
+            with open(path, "w", encoding="utf-8") as w:
+                w.write("45000\n")
+            # pylint: disable=protected-access
+            self.assertEqual(self.validator._read_sysfs(path), "45000")
+            with open(path, "w", encoding="utf-8") as w:
+                w.write("47000\n")
+            with patch("os.open") as mock_os_open:
+                self.assertEqual(self.validator._read_sysfs(path), "47000")
+                mock_os_open.assert_not_called()
+            self.assertIn(path, self.validator.sysfs_fds)
+
+    def test_read_sysfs_falls_back_to_read_file(self):
+        """_read_sysfs uses read_file when the attribute cannot be opened"""
+        with patch("os.open", side_effect=PermissionError), patch(
+            "amd_debug.validator.read_file", return_value="critical"
+        ) as mock_read:
+            # pylint: disable=protected-access
+            self.assertEqual(self.validator._read_sysfs("/sys/x/type"), "critical")
+        mock_read.assert_called_once_with("/sys/x/type")
+        self.assertEqual(self.validator.sysfs_fds, {})
+
+    def test_check_gpes_missing_interrupts(self):
+        """check_gpes copes with a missing ACPI interrupts directory"""
+        with patch("os.scandir", side_effect=FileNotFoundError), patch.object(
             self.validator.db, "record_debug"
         ) as mock_record:
             self.validator.check_gpes()
-        mock_record.assert_called_once()
-        self.assertIn("gpe01 increased from 1 to 2", mock_record.call_args[0][0])
-        self.assertEqual(self.validator.gpes["gpe01"], 2)
+            mock_record.assert_not_called()
+        self.assertEqual(self.validator.gpe_fds, {})
 
     def test_capture_wakeup_irq_data_oserror(self):
         """capture_wakeup_irq_data silently handles OSError"""
@@ -984,18 +1331,55 @@ class TestValidator(unittest.TestCase):
         dev = MagicMock(
             device_path="/devices/LNXTHERM:01", sys_path="/sys/devices/LNXTHERM:01"
         )
-        with patch.object(self.validator.pyudev, "list_devices", return_value=[dev]), \
-             patch(
-                 "amd_debug.validator.read_file",
-                 side_effect=["90000", "critical", "50000"],
-             ), \
-             patch("os.listdir", return_value=["trip_point_0_type", "trip_point_0_temp"]), \
-             patch.object(self.validator.db, "record_debug"), \
-             patch.object(self.validator.db, "record_prereq") as mock_prereq:
+        with patch.object(
+            self.validator.pyudev, "list_devices", return_value=[dev]
+        ), patch(
+            "amd_debug.validator.read_file",
+            side_effect=["90000", "critical", "50000"],
+        ), patch(
+            "os.listdir", return_value=["trip_point_0_type", "trip_point_0_temp"]
+        ), patch.object(
+            self.validator.db, "record_debug"
+        ), patch.object(
+            self.validator.db, "record_prereq"
+        ) as mock_prereq:
             result = self.validator.capture_thermal()
         self.assertFalse(result)
         mock_prereq.assert_called_once()
 
+    def test_capture_thermal_lists_trip_points_once(self):
+        """Trip points of a zone are only listed on the first capture"""
+        dev = MagicMock(
+            device_path="/devices/LNXTHERM:02", sys_path="/sys/devices/LNXTHERM:02"
+        )
+        with patch.object(
+            self.validator.pyudev, "list_devices", return_value=[dev]
+        ) as mock_list, patch(
+            "amd_debug.validator.read_file",
+            side_effect=["40000", "hot", "90000", "passive", "80000"] * 2,
+        ) as mock_read, patch(
+            "os.listdir",
+            return_value=[
+                "trip_point_1_temp",
+                "trip_point_0_type",
+                "trip_point_0_hyst",
+                "trip_point_1_type",
+                "trip_point_0_temp",
+                "temp",
+            ],
+        ) as mock_listdir, patch.object(
+            self.validator.db, "record_debug"
+        ), patch.object(
+            self.validator.db, "record_prereq"
+        ) as mock_prereq:
+            self.validator.capture_thermal()
+            self.validator.capture_thermal()
+        mock_list.assert_called_once()
+        mock_listdir.assert_called_once()
+        self.assertEqual(mock_read.call_count, 10)
+        self.assertIn("trip_point_1_temp", mock_read.call_args_list[4].args[0])
+        mock_prereq.assert_not_called()
+
     def test_capture_input_wakeup_count_walks_parents(self):
         """capture_input_wakeup_count walks parent devices to find wakeup_count"""
         parent = MagicMock(sys_path="/sys/devices/usb1")
@@ -1003,26 +1387,83 @@ class TestValidator(unittest.TestCase):
         child = MagicMock(sys_path="/sys/devices/input0")
         child.parent = parent
 
-        def _exists(path):
-            return path.startswith("/sys/devices/usb1/")
+        def _read(path):
+            if not path.startswith("/sys/devices/usb1/"):
+                raise FileNotFoundError(path)
+            return "7"
 
         with patch.object(
             self.validator.pyudev, "list_devices", return_value=[child]
-        ), patch("os.path.exists", side_effect=_exists), patch(
-            "amd_debug.validator.read_file", return_value="7"
-        ):
+        ), patch("amd_debug.validator.read_file", side_effect=_read):
             self.validator.capture_input_wakeup_count()
         self.assertEqual(self.validator.wakeup_count, {"/sys/devices/usb1": "7"})
 
+    def test_capture_input_wakeup_count_reuses_devices(self):
+        """Later cycles only read the wakeup_count of devices already found"""
+        child = MagicMock(sys_path="/sys/devices/input0")
+        child.parent = None
+        with patch.object(
+            self.validator.pyudev, "list_devices", return_value=[child]
+        ) as mock_list, patch(
+            "amd_debug.validator.read_file", side_effect=["5", "6"]
+        ) as mock_read, patch.object(
+            self.validator.db, "record_debug"
+        ) as mock_record:
+            self.validator.capture_input_wakeup_count()
+            self.validator.capture_input_wakeup_count()
+        mock_list.assert_called_once_with(subsystem="input")
+        mock_read.assert_called_with("/sys/devices/input0/power/wakeup_count")
+        mock_record.assert_called_once_with(
+            "Woke up from input source /sys/devices/input0 (5->6)"
+        )
+
+    def test_capture_input_wakeup_count_rescan(self):
+        """A rescan picks up input devices plugged in since the last cycle"""
+        first = MagicMock(sys_path="/sys/devices/input0")
+        first.parent = None
+        second = MagicMock(sys_path="/sys/devices/input1")
+        second.parent = None
+        with patch.object(
+            self.validator.pyudev,
+            "list_devices",
+            side_effect=[[first], [first, second]],
+        ) as mock_list, patch(
+            "amd_debug.validator.read_file", side_effect=["5", "5", "1", "5", "2"]
+        ), patch.object(
+            self.validator.db, "record_debug"
+        ) as mock_record:
+            self.validator.capture_input_wakeup_count(rescan=True)
+            self.validator.capture_input_wakeup_count(rescan=True)
+            self.validator.capture_input_wakeup_count()
+        self.assertEqual(mock_list.call_count, 2)
+        mock_record.assert_called_once_with(
+            "Woke up from input source /sys/devices/input1 (1->2)"
+        )
+
+    def test_capture_input_wakeup_count_no_devices(self):
+        """Without wakeup capable input devices later cycles read nothing"""
+        child = MagicMock(sys_path="/sys/devices/input0")
+        child.parent = None
+        with patch.object(
+            self.validator.pyudev, "list_devices", return_value=[child]
+        ) as mock_list, patch(
+            "amd_debug.validator.read_file", side_effect=FileNotFoundError
+        ) as mock_read:
+            self.validator.capture_input_wakeup_count()
+            self.validator.capture_input_wakeup_count()
+        mock_list.assert_called_once()
+        mock_read.assert_called_once()
+        self.assertEqual(self.validator.wakeup_count, {})
+
     def test_capture_input_wakeup_count_no_change(self):
         """Unchanged wakeup_count does not produce a debug record"""
         child = MagicMock(sys_path="/sys/devices/input0")
         child.parent = None
         with patch.object(
             self.validator.pyudev, "list_devices", return_value=[child]
-        ), patch("os.path.exists", return_value=True), patch(
-            "amd_debug.validator.read_file", return_value="5"
-        ), patch.object(self.validator.db, "record_debug") as mock_record:
+        ), patch("amd_debug.validator.read_file", return_value="5"), patch.object(
+            self.validator.db, "record_debug"
+        ) as mock_record:
             self.validator.wakeup_count = {"/sys/devices/input0": "5"}
             self.validator.capture_input_wakeup_count()
             mock_record.assert_not_called()
@@ -1031,9 +1472,15 @@ class TestValidator(unittest.TestCase):
         """capture_command_line records the kernel command line"""
         with patch(
             "amd_debug.validator.get_kernel_command_line", return_value="quiet x=1"
-        ), patch.object(self.validator.db, "record_debug") as mock_record:
+        ) as mock_cmdline, patch.object(
+            self.validator.db, "record_debug"
+        ) as mock_record:
             self.validator.capture_command_line()
             mock_record.assert_called_once_with("/proc/cmdline: quiet x=1")
+            # later cycles reuse the command line read on the first one
+            self.validator.capture_command_line()
+            mock_record.assert_called_with("/proc/cmdline: quiet x=1")
+            mock_cmdline.assert_called_once()
 
     def test_analyze_kernel_log_line_bios_returns_early(self):
         """sscanf_bios_args returning True (no string) short-circuits debug log"""
@@ -1044,6 +1491,30 @@ class TestValidator(unittest.TestCase):
             self.validator._analyze_kernel_log_line("ex_trace_point: stuff", 6)
             mock_record.assert_not_called()
 
+    def test_analyze_kernel_log_line_skips_bios_parse(self):
+        """Lines without a BIOS trace marker are not parsed as BIOS traces"""
+        with patch("amd_debug.validator.sscanf_bios_args") as mock_sscanf, patch.object(
+            self.validator.db, "record_debug"
+        ) as mock_record:
+            # pylint: disable=protected-access
+            self.validator._analyze_kernel_log_line("PM: suspend entry (s2idle)", 6)
+        mock_sscanf.assert_not_called()
+        mock_record.assert_called_once_with("PM: suspend entry (s2idle)", 6)
+
+    def test_analyze_kernel_log_line_notify_stripped(self):
+        """ACPI notify lines are recorded without the evmisc prefix and node"""
+        line = (
+            "evmisc-0132 ev_queue_notify_reques: Dispatching Notify on [UBTC] "
+            "(Device) Value 0x80 (Status Change) Node 00000000851b15c1"
+        )
+        with patch.object(self.validator.db, "record_debug") as mock_record:
+            # pylint: disable=protected-access
+            self.validator._analyze_kernel_log_line(line, 6)
+        mock_record.assert_called_once_with(
+            "Dispatching Notify on [UBTC] (Device) Value 0x80 (Status Change)", 7
+        )
+        self.assertEqual(list(self.validator.notify_devices), ["UBTC"])
+
     def test_analyze_kernel_log_line_branches(self):
         """Cover all branch arms in _analyze_kernel_log_line"""
         with patch.object(self.validator.db, "record_debug"):
@@ -1075,33 +1546,143 @@ class TestValidator(unittest.TestCase):
             self.assertIn("42", self.validator.active_gpios)
             # IRQ1 workaround marker
             from amd_debug.validator import Headers as VH
-            self.validator._analyze_kernel_log_line(VH.Irq1Workaround, 7)  # pylint: disable=protected-access
+
+            self.validator._analyze_kernel_log_line(
+                VH.Irq1Workaround, 7
+            )  # pylint: disable=protected-access
             self.assertTrue(self.validator.irq1_workaround)
             # Successfully transitioned (AMD GUID)
             self.validator._analyze_kernel_log_line(  # pylint: disable=protected-access
                 "Successfully transitioned to state foo", 7
             )
 
+    def test_analyze_kernel_log_line_gpio_searched_once(self):
+        """An active GPIO line is only searched by the regex once"""
+        with patch.object(self.validator.db, "record_debug"), patch(
+            "amd_debug.validator._GPIO_ACTIVE_RE"
+        ) as mock_re:
+            mock_re.search.return_value.group.return_value = "GPIO 7 is active"
+            # pylint: disable=protected-access
+            self.validator._analyze_kernel_log_line("GPIO 7 is active", 7)
+            self.validator._analyze_kernel_log_line("PM: suspend entry", 7)
+        mock_re.search.assert_called_once_with("GPIO 7 is active")
+        self.assertEqual(self.validator.active_gpios, ["7"])
+
     def test_analyze_kernel_log_idle_mask_bit_change(self):
         """analyze_kernel_log records idle mask bit changes"""
         self.validator.idle_masks = ["0x3", "0x1"]  # bit 1 cleared
-        with patch.object(
-            self.validator.kernel_log, "process_callback"
-        ), patch.object(self.validator.db, "record_debug") as mock_record, patch.object(
-            self.validator.db, "record_cycle_data"
-        ):
+        with patch.object(self.validator.kernel_log, "process_callback"), patch.object(
+            self.validator.db, "record_debug"
+        ) as mock_record, patch.object(self.validator.db, "record_cycle_data"):
             self.validator.analyze_kernel_log()
         # bit 1 changed (0x2)
         self.assertTrue(
             any("Idle mask bit 1" in c.args[0] for c in mock_record.call_args_list)
         )
 
+    def test_analyze_kernel_log_idle_mask_later_clear(self):
+        """Bits cleared in any later mask are reported, set bits are not"""
+        self.validator.idle_masks = ["0x5", "0x5", "0x1", "0x4", "0xc"]
+        with patch.object(self.validator.kernel_log, "process_callback"), patch.object(
+            self.validator.db, "record_debug"
+        ) as mock_record, patch.object(self.validator.db, "record_cycle_data"):
+            self.validator.analyze_kernel_log()
+        changed = [
+            c.args[0]
+            for c in mock_record.call_args_list
+            if "Idle mask bit" in c.args[0]
+        ]
+        self.assertEqual(
+            changed,
+            [
+                "Idle mask bit 0 (0x1) changed during suspend",
+                "Idle mask bit 2 (0x4) changed during suspend",
+            ],
+        )
+
+    def test_analyze_kernel_log_idle_mask_bit_31(self):
+        """Idle mask bits 0-30 are reported, bit 31 is not"""
+        self.validator.idle_masks = ["0x80000401", "0x0"]
+        with patch.object(self.validator.kernel_log, "process_callback"), patch.object(
+            self.validator.db, "record_debug"
+        ) as mock_record, patch.object(self.validator.db, "record_cycle_data"):
+            self.validator.analyze_kernel_log()
+        changed = [
+            c.args[0]
+            for c in mock_record.call_args_list
+            if "Idle mask bit" in c.args[0]
+        ]
+        self.assertEqual(
+            changed,
+            [
+                "Idle mask bit 0 (0x1) changed during suspend",
+                "Idle mask bit 10 (0x400) changed during suspend",
+            ],
+        )
+
+    def test_analyze_kernel_log_line_dedups_in_order(self):
+        """Repeated IRQs, page faults and notifies are kept once in first-seen order"""
+        lines = [
+            "Triggering wakeup from IRQ 9",
+            "Dispatching Notify on [UBTC] (Device) Value 0x80",
+            "Triggering wakeup from IRQ 5",
+            "Event logged [IO_PAGE_FAULT device=0000:00:0c.0 domain=0x0000]",
+            "Dispatching Notify on [LID0] (Device) Value 0x80",
+            "Triggering wakeup from IRQ 9",
+            "Dispatching Notify on [UBTC] (Device) Value 0x80",
+            "Event logged [IO_PAGE_FAULT device=0000:00:0c.0 domain=0x0000]",
+        ]
+        with patch.object(self.validator.db, "record_debug"):
+            for line in lines:
+                self.validator._analyze_kernel_log_line(  # pylint: disable=protected-access
+                    line, 6
+                )
+        self.assertEqual(list(self.validator.wakeup_irqs), [9, 5])
+        self.assertEqual(list(self.validator.notify_devices), ["UBTC", "LID0"])
+        self.assertEqual(list(self.validator.page_faults), ["0000:00:0c.0"])
+
+    def test_analyze_kernel_log_line_malformed_devices(self):
+        """Page fault and notify lines without a device are still recorded"""
+        lines = [
+            "Event logged [IO_PAGE_FAULT domain=0x0000]",
+            "Event logged [IO_PAGE_FAULT device=0000:00:0c.0",
+            "Dispatching Notify on UBTC (Device) Value 0x80",
+            "Dispatching Notify on [UBTC (Device) Value 0x80",
+        ]
+        with patch.object(self.validator.db, "record_debug") as mock_record:
+            for line in lines:
+                self.validator._analyze_kernel_log_line(  # pylint: disable=protected-access
+                    line, 6
+                )
+        self.assertEqual(mock_record.call_count, len(lines))
+        self.assertEqual(self.validator.page_faults, {})
+        self.assertEqual(self.validator.notify_devices, {})
+
+    def test_reset_cycle_results(self):
+        """Results from the previous cycle's kernel log are cleared"""
+        self.validator.cycle_count = 3
+        self.validator.upep = True
+        self.validator.wakeup_irqs = {1: None}
+        self.validator.idle_masks = ["0x1"]
+        self.validator.notify_devices = {"UBTC": None}
+        self.validator.irq1_workaround = True
+        self.validator.wakeup_count = {"/sys/devices/input0": "3"}
+        self.validator._reset_cycle_results()  # pylint: disable=protected-access
+        self.assertEqual(self.validator.cycle_count, 0)
+        self.assertFalse(self.validator.upep)
+        self.assertEqual(self.validator.wakeup_irqs, {})
+        self.assertEqual(self.validator.idle_masks, [])
+        self.assertEqual(self.validator.notify_devices, {})
+        self.assertFalse(self.validator.irq1_workaround)
+        # state compared across cycles is kept
+        self.assertEqual(self.validator.wakeup_count, {"/sys/devices/input0": "3"})
+
     def test_analyze_kernel_log_irq1_workaround_used(self):
         """IRQ1 in wakeup with workaround marker records the workaround note"""
         self.validator.cpu_family = 0x17
         self.validator.cpu_model = 0x68
         self.validator.smu_version = "1.0.0"
-        self.validator.wakeup_irqs = [1]
+        self.validator.wakeup_irqs = {1: None}
         self.validator.irq1_workaround = True
         with patch.object(self.validator.kernel_log, "process_callback"), patch.object(
             self.validator.db, "record_cycle_data"
@@ -1119,7 +1700,7 @@ class TestValidator(unittest.TestCase):
         self.validator.cpu_family = 0x17
         self.validator.cpu_model = 0x68
         self.validator.smu_version = "1.0.0"
-        self.validator.wakeup_irqs = [1]
+        self.validator.wakeup_irqs = {1: None}
         self.validator.irq1_workaround = False
         before = len(self.validator.failures)
         with patch.object(self.validator.kernel_log, "process_callback"), patch.object(
@@ -1143,6 +1724,7 @@ class TestValidator(unittest.TestCase):
     def test_analyze_duration_spurious(self, _mock_print):
         """Userspace woke too early -> SpuriousWakeup recorded"""
         from amd_debug.failures import SpuriousWakeup
+
         t0 = datetime(2025, 1, 1, 0, 0, 0)
         t1 = t0 + timedelta(seconds=1)
         self.validator.failures = []
@@ -1155,6 +1737,7 @@ class TestValidator(unittest.TestCase):
     def test_analyze_duration_low_hw_residency(self, _mock_print):
         """Long cycle with low hw% -> LowHardwareSleepResidency recorded"""
         from amd_debug.failures import LowHardwareSleepResidency
+
         t0 = datetime(2025, 1, 1, 0, 0, 0)
         t1 = t0 + timedelta(seconds=120)
         self.validator.failures = []
@@ -1171,13 +1754,115 @@ class TestValidator(unittest.TestCase):
         self.validator.logind = False
         self.assertTrue(self.validator.unlock_session())
 
+    def _fake_dbus(self):
+        """Build a stand-in dbus module whose manager allows suspend"""
+        fake = MagicMock()
+        fake.exceptions.DBusException = type("DBusException", (Exception,), {})
+        manager = MagicMock()
+        manager.CanSuspend.return_value = "yes"
+        props = MagicMock()
+        props.Get.return_value = False
+        fake.Interface.side_effect = lambda obj, name: (
+            manager if name.endswith("Manager") else props
+        )
+        return fake, manager
+
+    @patch("amd_debug.validator.toggle_pm_debug")
+    def test_logind_interfaces_reused(self, _mock_toggle):
+        """The logind bus and interfaces are only set up once"""
+        fake, manager = self._fake_dbus()
+        self.validator.logind = True
+        with patch("amd_debug.validator.dbus", fake):
+            self.assertTrue(self.validator.suspend_system())
+            self.assertTrue(self.validator.suspend_system())
+            self.assertTrue(self.validator.unlock_session())
+        fake.SystemBus.assert_called_once()
+        self.assertEqual(manager.Suspend.call_count, 2)
+        manager.UnlockSessions.assert_called_once()
+
+    @patch("amd_debug.validator.toggle_pm_debug")
+    def test_suspend_system_logind_dbus_error(self, _mock_toggle):
+        """A dbus failure is recorded and suspend is reported as failed"""
+        fake, manager = self._fake_dbus()
+        manager.Suspend.side_effect = fake.exceptions.DBusException("denied")
+        self.validator.logind = True
+        with patch("amd_debug.validator.dbus", fake):
+            self.assertFalse(self.validator.suspend_system())
+        self.validator.db.record_cycle_data.assert_called_with(
+            "Unable to communicate with logind: denied", "❌"
+        )
+
+    def _fake_glib_modules(self, fake_dbus, loop):
+        """Build the modules needed for the signal based resume wait"""
+        glib = MagicMock()
+        glib.MainLoop.return_value = loop
+        repository = MagicMock(GLib=glib)
+        return glib, {
+            "dbus": fake_dbus,
+            "dbus.mainloop": fake_dbus.mainloop,
+            "dbus.mainloop.glib": fake_dbus.mainloop.glib,
+            "gi": MagicMock(repository=repository),
+            "gi.repository": repository,
+        }
+
+    @patch("amd_debug.validator.toggle_pm_debug")
+    def test_suspend_system_logind_signal(self, _mock_toggle):
+        """Suspend waits for PrepareForSleep(false) instead of polling"""
+        fake, manager = self._fake_dbus()
+        loop = MagicMock()
+        # a stale resume from an earlier cycle is delivered first
+        loop.run.side_effect = lambda: (
+            self.validator._prepare_for_sleep(False),
+            self.validator._prepare_for_sleep(True),
+            self.validator._prepare_for_sleep(False),
+        )
+        glib, modules = self._fake_glib_modules(fake, loop)
+        self.validator.logind = True
+        with patch.dict(sys.modules, modules), patch(
+            "amd_debug.validator.dbus", fake
+        ), patch("amd_debug.validator.time.sleep") as mock_sleep:
+            self.assertTrue(self.validator.suspend_system())
+        fake.SystemBus.return_value.add_signal_receiver.assert_called_once()
+        manager.Suspend.assert_called_once_with(True)
+        loop.quit.assert_called_once()
+        glib.source_remove.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch("amd_debug.validator.toggle_pm_debug")
+    def test_suspend_system_logind_signal_timeout(self, _mock_toggle):
+        """A resume signal that never arrives is reported as a failure"""
+        fake, _manager = self._fake_dbus()
+        loop = MagicMock()
+        glib, modules = self._fake_glib_modules(fake, loop)
+        loop.run.side_effect = lambda: glib.timeout_add_seconds.call_args[0][1]()
+        self.validator.logind = True
+        with patch.dict(sys.modules, modules), patch("amd_debug.validator.dbus", fake):
+            self.assertFalse(self.validator.suspend_system())
+        glib.source_remove.assert_not_called()
+        self.validator.db.record_cycle_data.assert_called_with(
+            "Timed out waiting for logind to resume", "❌"
+        )
+
+    @patch("amd_debug.validator.toggle_pm_debug")
+    def test_suspend_system_missing_dbus(self, _mock_toggle):
+        """suspend_system reports a missing dbus module without suspending"""
+        self.validator.logind = True
+        with patch("amd_debug.validator.dbus", None):
+            self.assertFalse(self.validator.suspend_system())
+        self.validator.db.record_cycle_data.assert_called_with("Missing dbus", "❌")
+
+    def test_unlock_session_missing_dbus(self):
+        """unlock_session reports a missing dbus module"""
+        self.validator.logind = True
+        with patch("amd_debug.validator.dbus", None):
+            self.assertFalse(self.validator.unlock_session())
+        self.validator.db.record_cycle_data.assert_called_with("Missing dbus", "❌")
+
     def test_systemd_pre_hook(self):
         """systemd_pre_hook calls prep, sync, and enables pm_debug"""
         with patch.object(self.validator, "prep") as mock_prep, patch.object(
             self.validator.db, "sync"
-        ) as mock_sync, patch(
-            "amd_debug.validator.toggle_pm_debug"
-        ) as mock_toggle:
+        ) as mock_sync, patch("amd_debug.validator.toggle_pm_debug") as mock_toggle:
             self.validator.systemd_pre_hook()
             mock_prep.assert_called_once()
             mock_sync.assert_called_once()